@@ -0,0 +1,47 @@
+"""
+Board encoding: time and size per format and word length.
+
+    python -m benchmarks.bench_encode [--repeat N]
+"""
+import argparse
+import random
+import time
+
+from src.game.dictionary import get_dictionary
+from src.game.render import render_board_image, encode_board
+
+ENCODERS = {
+    "png (level 6)":          dict(fmt="png", compress_level=6),
+    "png (level 1)":          dict(fmt="png", compress_level=1),
+    "png_palette 64 (lvl 6)": dict(fmt="png_palette", compress_level=6, palette_colors=64),
+    "png_palette 32 (lvl 1)": dict(fmt="png_palette", compress_level=1, palette_colors=32),
+    "webp q90":               dict(fmt="webp", webp_quality=90),
+    "webp q75":               dict(fmt="webp", webp_quality=75),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    dictionary = get_dictionary()
+
+    print(f"{'len':>3}  {'encoder':<24} {'ms':>7} {'bytes':>8}")
+    for length in range(4, 12):
+        secret = rng.choice(dictionary.words(length))
+        guesses = [rng.choice(dictionary.valid_words(length)) for _ in range(5)]
+        img = render_board_image(guesses, secret)
+
+        for name, options in ENCODERS.items():
+            encode_board(img, **options)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                data = encode_board(img, **options)
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            print(f"{length:>3}  {name:<24} {elapsed:>7.1f} {len(data):>8}")
+
+
+if __name__ == "__main__":
+    main()
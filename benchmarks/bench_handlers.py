@@ -0,0 +1,255 @@
+"""
+Hot-path benchmark: handle_guess, hint, receive_length and the board renderer
+driven with fake Update/Context objects against synthetic user stores.
+
+    python -m benchmarks.bench_handlers [--users 1000 10000 100000] [--calls 200] [--backend sqlite|json]
+
+For every handler it prints the mean and p95 latency of a whole call, the mean
+time spent per stage (store load/save, dictionary lookups, analyze_guess,
+rendering) and the mean peak of Python allocations per call (tracemalloc).
+Stages nest: analyze_guess runs inside render.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+
+from benchmarks.fakes import FakeContext, FakeUpdate, FakeUser
+from src.commands import guess, hint, play
+from src.decorators import checkban
+from src.game import logic, render
+from src.game.dictionary import Dictionary, get_dictionary
+from src.storage import leaderboard, store
+from src.storage.backends import JsonBackend, SqliteBackend
+
+# function name -> stage, patched in every module that references it
+STORE_STAGES = {
+    "load_user":   "store load",
+    "load_global": "store load",
+    "iter_users":  "store load",
+    "save_user":   "store save",
+    "save_global": "store save",
+}
+PATCHED_MODULES = (guess, hint, play, checkban, store)
+
+
+class Stages:
+    """Accumulates time per stage for the current call."""
+
+    def __init__(self):
+        self.current = defaultdict(float)
+
+    def wrap(self, stage: str, fn):
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def timed_async(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.current[stage] += time.perf_counter() - start
+            return timed_async
+
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                # generators (iter_users) are timed until fully consumed
+                if hasattr(result, "__next__"):
+                    result = iter(list(result))
+                return result
+            finally:
+                self.current[stage] += time.perf_counter() - start
+        return timed
+
+    def install(self):
+        for module in PATCHED_MODULES:
+            for name, stage in STORE_STAGES.items():
+                if hasattr(module, name):
+                    setattr(module, name, self.wrap(stage, getattr(module, name)))
+        for name in ("__contains__", "is_main", "words", "common_letter_words"):
+            setattr(Dictionary, name, self.wrap("dictionary", getattr(Dictionary, name)))
+        logic.analyze_guess = self.wrap("analyze_guess", logic.analyze_guess)
+        guess.render_board = self.wrap("render", guess.render_board)
+
+    def take(self) -> dict[str, float]:
+        current, self.current = self.current, defaultdict(float)
+        return current
+
+
+def make_backend(kind: str, directory: Path, users: int, rng: random.Random):
+    dictionary = get_dictionary()
+    data = {}
+    for uid in range(1, users + 1):
+        games = rng.randint(0, 50)
+        wins = rng.randint(0, games)
+        record = {
+            "first_name": f"user{uid}",
+            "username": f"user{uid}",
+            "suggested_words": [],
+            "stats": {
+                "games_played": games,
+                "wins": wins,
+                "losses": games - wins,
+                "win_rate": wins / games if games else 0.0
+            },
+            "banned": False,
+            "last_seen_msk": "2025-01-01T00:00:00+03:00",
+        }
+        if rng.random() < 0.3:
+            length = rng.randint(4, 11)
+            record["current_game"] = {
+                "secret": rng.choice(dictionary.words(length)),
+                "attempts": 0,
+                "guesses": [],
+            }
+        data[str(uid)] = record
+
+    if kind == "json":
+        backend = JsonBackend(directory / "user_activity.json")
+    else:
+        backend = SqliteBackend(directory / "user_activity.db")
+    backend.save_all({"users": data, "global": {
+        "total_games": 0, "total_wins": 0, "total_losses": 0, "win_rate": 0.0
+    }})
+    return backend
+
+
+def start_game(backend, uid: str, rng: random.Random, attempts: int, hint_used: bool = False) -> str:
+    """Put the user into a running game (not timed). Returns the secret."""
+    dictionary = get_dictionary()
+    length = rng.randint(4, 11)
+    secret = rng.choice(dictionary.words(length))
+    guesses = [rng.choice(dictionary.valid_words(length)) for _ in range(attempts)]
+    # through the store: the write-behind buffer may hold a newer record
+    user = store.load_user(uid)
+    user["current_game"] = {"secret": secret, "attempts": attempts, "guesses": guesses, "hint_used": hint_used}
+    store.save_user(uid, user)
+    return secret
+
+
+def scenario_guess(backend, users: int, rng: random.Random):
+    uid = rng.randint(1, users)
+    secret = start_game(backend, str(uid), rng, attempts=rng.randint(0, 5))
+    word = rng.choice(get_dictionary().valid_words(len(secret)))
+    return guess.handle_guess, FakeUpdate(FakeUser(uid), word)
+
+
+def scenario_hint(backend, users: int, rng: random.Random):
+    uid = rng.randint(1, users)
+    start_game(backend, str(uid), rng, attempts=rng.randint(0, 3))
+    return hint.hint, FakeUpdate(FakeUser(uid), "/hint")
+
+
+def scenario_receive_length(backend, users: int, rng: random.Random):
+    uid = rng.randint(1, users)
+    return play.receive_length, FakeUpdate(FakeUser(uid), str(rng.randint(4, 11)))
+
+
+SCENARIOS = {
+    "handle_guess":   scenario_guess,
+    "hint":           scenario_hint,
+    "receive_length": scenario_receive_length,
+}
+
+
+async def run_handler(name, backend, users, calls, rng, stages) -> tuple[list[float], dict, float]:
+    totals = []
+    per_stage = defaultdict(float)
+    for _ in range(calls):
+        handler, update = SCENARIOS[name](backend, users, rng)
+        stages.take()
+        start = time.perf_counter()
+        await handler(update, FakeContext())
+        totals.append(time.perf_counter() - start)
+        for stage, elapsed in stages.take().items():
+            per_stage[stage] += elapsed
+
+    # allocations in a separate, shorter pass: tracemalloc slows everything down
+    peaks = []
+    tracemalloc.start()
+    for _ in range(max(1, calls // 10)):
+        handler, update = SCENARIOS[name](backend, users, rng)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        await handler(update, FakeContext())
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return totals, {k: v / calls for k, v in per_stage.items()}, statistics.mean(peaks)
+
+
+def run_render(calls: int, rng: random.Random) -> list[tuple[str, list[float]]]:
+    dictionary = get_dictionary()
+    full, incremental = [], []
+    for i in range(calls):
+        length = rng.randint(4, 11)
+        secret = rng.choice(dictionary.words(length))
+        guesses = [rng.choice(dictionary.valid_words(length)) for _ in range(rng.randint(1, 6))]
+
+        start = time.perf_counter()
+        render.render_full_board_with_keyboard(guesses, secret)
+        full.append(time.perf_counter() - start)
+
+        # previous attempt rendered with state, then time the next one
+        render.render_full_board_with_keyboard(guesses[:-1], secret, state_key=i)
+        start = time.perf_counter()
+        render.render_full_board_with_keyboard(guesses, secret, state_key=i)
+        incremental.append(time.perf_counter() - start)
+        render.evict_render_state(i)
+    return [("render (full)", full), ("render (incremental)", incremental)]
+
+
+def fmt_ms(seconds: float) -> str:
+    return f"{seconds * 1000:8.2f}"
+
+
+def p95(values: list[float]) -> float:
+    return statistics.quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--backend", choices=("sqlite", "json"), default="sqlite")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    get_dictionary()
+    stages = Stages()
+    stages.install()
+    stage_names = ["store load", "store save", "dictionary", "analyze_guess", "render"]
+
+    print(f"{'handler':<22}{'users':>8}{'mean ms':>9}{'p95 ms':>9}"
+          + "".join(f"{s:>15}" for s in stage_names) + f"{'peak KB':>10}")
+
+    for users in args.users:
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = make_backend(args.backend, Path(tmp), users, rng)
+            store.set_backend(backend)
+            leaderboard.load_leaderboard()
+            for name in SCENARIOS:
+                totals, per_stage, peak = await run_handler(name, backend, users, args.calls, rng, stages)
+                print(f"{name:<22}{users:>8}{fmt_ms(statistics.mean(totals)):>9}{fmt_ms(p95(totals)):>9}"
+                      + "".join(f"{fmt_ms(per_stage.get(s, 0.0)):>15}" for s in stage_names)
+                      + f"{peak / 1024:>10.1f}")
+            store.set_backend(None)
+            backend.close()
+
+    for name, totals in run_render(max(10, args.calls // 4), rng):
+        print(f"{name:<22}{'-':>8}{fmt_ms(statistics.mean(totals)):>9}{fmt_ms(p95(totals)):>9}")
+
+    await render.shutdown_render_pool(None)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Minimal stand-ins for telegram Update/Context objects used by the handlers."""
+import itertools
+from types import SimpleNamespace
+from dataclasses import dataclass, field
+
+
+@dataclass
+class FakeUser:
+    id: int
+    first_name: str = "Bench"
+    last_name: str | None = None
+    username: str | None = None
+    is_bot: bool = False
+    is_premium: bool = False
+    language_code: str = "ru"
+
+
+class FakeMessage:
+    def __init__(self, text: str):
+        self.text = text
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+    async def reply_photo(self, photo=None, caption=None, **kwargs):
+        self.replies.append(caption)
+
+    async def reply_document(self, document=None, caption=None, **kwargs):
+        self.replies.append(caption)
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+        self.edited = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        self.edited.append((chat_id, message_id, text))
+
+    async def send_document(self, chat_id, document=None, caption=None, **kwargs):
+        self.sent.append((chat_id, caption))
+
+
+_update_ids = itertools.count(1)
+
+
+class FakeUpdate:
+    def __init__(self, user: FakeUser, text: str):
+        self.update_id = next(_update_ids)
+        self.effective_user = user
+        self.effective_chat = SimpleNamespace(id=user.id)
+        self.message = FakeMessage(text)
+        self.callback_query = None
+
+
+@dataclass
+class FakeContext:
+    bot: FakeBot = field(default_factory=FakeBot)
+    user_data: dict = field(default_factory=dict)
+    args: list = field(default_factory=list)
@@ -6,8 +6,9 @@ from collections import Counter
 from telegram import Update, BotCommand, BotCommandScopeChat, InputFile
 from telegram.ext import ContextTypes
 
-from src.storage.store import load_store, save_store
-from src.main.config import ADMIN_ID, BASE_FILE, USER_FILE
+from src.storage.store import load_user, save_user, dump_store_json
+from src.storage.locks import user_lock
+from src.main.config import ADMIN_ID, BASE_FILE
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ async def set_commands(app):
             BotCommand("hint", "Подсказка"),
             BotCommand("reset", "Сбросить игру"),
             BotCommand("notification", "Включить/Отключить уведомления"),
+            BotCommand("difficulty", "Сменить сложность слов"),
             BotCommand("my_stats", "Ваша статистика"),
             BotCommand("global_stats", "Глобальная статистика"),
             BotCommand("feedback", "Жалоба на слово"),
@@ -40,16 +42,11 @@ async def set_commands(app):
 # Sends user_activity.json to admin on startup
 async def send_activity_periodic(context: ContextTypes.DEFAULT_TYPE):
     ADMIN_ID = int(os.getenv("ADMIN_ID", "0"))
-    activity_path = USER_FILE
-    if not activity_path.exists():
-        return
-
-    with activity_path.open("rb") as f:
-        await context.bot.send_document(
-            chat_id=ADMIN_ID,
-            document=InputFile(f, filename="user_activity.json"),
-            caption="📁 user_activity.json"
-        )
+    await context.bot.send_document(
+        chat_id=ADMIN_ID,
+        document=InputFile(BytesIO(dump_store_json()), filename="user_activity.json"),
+        caption="📁 user_activity.json"
+    )
 
 
 async def dict_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -100,15 +97,10 @@ async def dump_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user.id != ADMIN_ID:
         return
 
-    path = USER_FILE
-    if not path.exists():
-        return await update.message.reply_text("Файл user_activity.json не найден.")
-
-    with path.open("rb") as f:
-        await update.message.reply_document(
-            document=InputFile(f, filename=path.name),
-            caption="📁 user_activity.json"
-        )
+    await update.message.reply_document(
+        document=InputFile(BytesIO(dump_store_json()), filename="user_activity.json"),
+        caption="📁 user_activity.json"
+    )
 
 
 async def _validate_user_id(update: Update, context: ContextTypes.DEFAULT_TYPE) -> tuple[bool, str | None]:
@@ -133,42 +125,43 @@ async def ban_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_valid:
         return
     
-    store = load_store()
-    users = store["users"]
+    # the user's own update in flight must not overwrite the ban
+    async with user_lock(user_id):
+        user = load_user(user_id)
     
-    # If user is not in database, add them
-    if user_id not in users:
-        users[user_id] = {
-            "first_name": f"Заблокированный пользователь ({user_id})",
-            "suggested_words": [],
-            "stats": {"games_played": 0, "wins": 0, "losses": 0, "win_rate": 0.0},
-            "banned": True,
-            "notification": False  # Disable notifications on ban
-        }
-        await update.message.reply_text(f"✅ Пользователь с ID {user_id} успешно заблокирован.")
-    else:
-        # If user exists in database, update ban status
-        if users[user_id].get("banned", False):
-            await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} уже заблокирован.")
+        # If user is not in database, add them
+        if user is None:
+            user = {
+                "first_name": f"Заблокированный пользователь ({user_id})",
+                "suggested_words": [],
+                "stats": {"games_played": 0, "wins": 0, "losses": 0, "win_rate": 0.0},
+                "banned": True,
+                "notification": False  # Disable notifications on ban
+            }
+            await update.message.reply_text(f"✅ Пользователь с ID {user_id} успешно заблокирован.")
         else:
-            users[user_id]["banned"] = True
-            users[user_id]["notification"] = False  # Disable notifications on ban
-            # Reset guessing state
-            if "current_game" in users[user_id]:
-                del users[user_id]["current_game"]
-            await update.message.reply_text(f"✅ Пользователь {users[user_id].get('first_name', user_id)} (ID: {user_id}) успешно заблокирован.")
-            try:
-                await context.bot.send_message(
-                    chat_id=int(user_id),
-                    text="❌ Вы были заблокированы в этом боте.\n\n"
-                         "Если вы считаете, что это произошло по ошибке, пожалуйста, свяжитесь с администратором."
-                )
-                # Reset user state after ban
-                context.user_data.clear()
-            except Exception as e:
-                logger.error(f"Не удалось отправить уведомление о блокировке пользователю {user_id}: {e}")
+            # If user exists in database, update ban status
+            if user.get("banned", False):
+                await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} уже заблокирован.")
+            else:
+                user["banned"] = True
+                user["notification"] = False  # Disable notifications on ban
+                # Reset guessing state
+                if "current_game" in user:
+                    del user["current_game"]
+                await update.message.reply_text(f"✅ Пользователь {user.get('first_name', user_id)} (ID: {user_id}) успешно заблокирован.")
+                try:
+                    await context.bot.send_message(
+                        chat_id=int(user_id),
+                        text="❌ Вы были заблокированы в этом боте.\n\n"
+                             "Если вы считаете, что это произошло по ошибке, пожалуйста, свяжитесь с администратором."
+                    )
+                    # Reset user state after ban
+                    context.user_data.clear()
+                except Exception as e:
+                    logger.error(f"Не удалось отправить уведомление о блокировке пользователю {user_id}: {e}")
     
-    save_store(store)
+        save_user(user_id, user)
 
 
 async def unban_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -176,33 +169,33 @@ async def unban_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_valid:
         return
     
-    store = load_store()
-    users = store["users"]
+    async with user_lock(user_id):
+        user = load_user(user_id)
     
-    if user_id not in users:
-        await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} не найден в базе.")
-    else:
-        if not users[user_id].get("banned", False):
-            await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} не заблокирован.")
+        if user is None:
+            await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} не найден в базе.")
         else:
-            users[user_id]["banned"] = False
-            # Remove notification flag to use default settings
-            if "notification" in users[user_id]:
-                del users[user_id]["notification"]
-            # Remove current game if exists
-            if "current_game" in users[user_id]:
-                del users[user_id]["current_game"]
-            # Set flag that user was unbanned
-            users[user_id]["was_banned"] = True
-            save_store(store)
-            await update.message.reply_text(f"✅ Пользователь {users[user_id].get('first_name', user_id)} (ID: {user_id}) успешно разблокирован.")
-            try:
-                await context.bot.send_message(
-                    chat_id=int(user_id),
-                    text="✅ Вы были разблокированы в этом боте.\n\n"
-                         "Теперь вы можете снова использовать все функции бота."
-                )
+            if not user.get("banned", False):
+                await update.message.reply_text(f"ℹ️ Пользователь с ID {user_id} не заблокирован.")
+            else:
+                user["banned"] = False
+                # Remove notification flag to use default settings
+                if "notification" in user:
+                    del user["notification"]
+                # Remove current game if exists
+                if "current_game" in user:
+                    del user["current_game"]
                 # Set flag that user was unbanned
-                context.user_data["was_banned"] = True
-            except Exception as e:
-                logger.error(f"Не удалось отправить уведомление о разблокировке пользователю {user_id}: {e}")
\ No newline at end of file
+                user["was_banned"] = True
+                save_user(user_id, user)
+                await update.message.reply_text(f"✅ Пользователь {user.get('first_name', user_id)} (ID: {user_id}) успешно разблокирован.")
+                try:
+                    await context.bot.send_message(
+                        chat_id=int(user_id),
+                        text="✅ Вы были разблокированы в этом боте.\n\n"
+                             "Теперь вы можете снова использовать все функции бота."
+                    )
+                    # Set flag that user was unbanned
+                    context.user_data["was_banned"] = True
+                except Exception as e:
+                    logger.error(f"Не удалось отправить уведомление о разблокировке пользователю {user_id}: {e}")
\ No newline at end of file
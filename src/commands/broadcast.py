@@ -1,16 +1,196 @@
+import asyncio
+import json
 import logging
+from dataclasses import dataclass, field
 from telegram import Update
 from telegram.ext import (
     ContextTypes,
     ConversationHandler,
 )
 
-from src.storage.store import load_store
-from src.main.config import ADMIN_ID
+from src.storage.store import get_indexes
+from src.storage.files import atomic_write_text
+from src.main.sender import BulkSender
+from src.main.config import ADMIN_ID, BROADCAST_FILE, BROADCAST_CURSOR_FILE, BROADCAST_PROGRESS_INTERVAL
 from src.main.constants import BROADCAST
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class BroadcastJob:
+    """
+    A broadcast in progress. Recipients and text are written once to BROADCAST_FILE,
+    progress is checkpointed to BROADCAST_CURSOR_FILE, so a restart resumes where it stopped.
+    """
+    text: str
+    chat_ids: list[int]
+    admin_chat: int
+    skipped: int = 0
+    # every index below cursor is done, `ahead` holds done indices past it
+    cursor: int = 0
+    ahead: set[int] = field(default_factory=set)
+    sent: int = 0
+    failed: list[int] = field(default_factory=list)
+    status_message_id: int | None = None
+
+    @property
+    def done(self) -> int:
+        return self.cursor + len(self.ahead)
+
+    def remaining(self) -> list[int]:
+        return [i for i in range(self.cursor, len(self.chat_ids)) if i not in self.ahead]
+
+    def record(self, index: int, error: str | None) -> None:
+        if error is None:
+            self.sent += 1
+        else:
+            logger.error(f"Ошибка при отправке сообщения пользователю {self.chat_ids[index]}: {error}")
+            self.failed.append(self.chat_ids[index])
+        self.ahead.add(index)
+        while self.cursor in self.ahead:
+            self.ahead.remove(self.cursor)
+            self.cursor += 1
+
+    def save(self) -> None:
+        atomic_write_text(BROADCAST_FILE, json.dumps({
+            "text": self.text,
+            "chat_ids": self.chat_ids,
+            "admin_chat": self.admin_chat,
+            "skipped": self.skipped,
+        }, ensure_ascii=False))
+        self.save_cursor()
+
+    def cursor_json(self) -> str:
+        """Progress snapshot; build it on the event loop, where record() changes it."""
+        return json.dumps({
+            "cursor": self.cursor,
+            "ahead": sorted(self.ahead),
+            "sent": self.sent,
+            "failed": self.failed,
+            "status_message_id": self.status_message_id,
+        })
+
+    def save_cursor(self) -> None:
+        atomic_write_text(BROADCAST_CURSOR_FILE, self.cursor_json())
+
+    @classmethod
+    def load(cls) -> "BroadcastJob | None":
+        try:
+            job = cls(**json.loads(BROADCAST_FILE.read_text("utf-8")))
+        except FileNotFoundError:
+            return None
+        try:
+            progress = json.loads(BROADCAST_CURSOR_FILE.read_text("utf-8"))
+        except FileNotFoundError:
+            return job
+        job.cursor = progress["cursor"]
+        job.ahead = set(progress["ahead"])
+        job.sent = progress["sent"]
+        job.failed = progress["failed"]
+        job.status_message_id = progress.get("status_message_id")
+        return job
+
+    @staticmethod
+    def clear() -> None:
+        BROADCAST_FILE.unlink(missing_ok=True)
+        BROADCAST_CURSOR_FILE.unlink(missing_ok=True)
+
+    def progress_text(self) -> str:
+        return (f"📤 Рассылка: {self.done} из {len(self.chat_ids)}\n"
+                f"• Отправлено: {self.sent}\n"
+                f"• Ошибок: {len(self.failed)}")
+
+    def report_text(self) -> str:
+        msg = f"✅ Рассылка успешно отправлена!\n"
+        msg += f"• Отправлено: {self.sent} пользователям\n"
+        msg += f"• Пропущено (забанено): {self.skipped}"
+        if self.failed:
+            msg += f"\n\n❌ Не удалось доставить сообщения пользователям: {', '.join(map(str, self.failed))}"
+        return msg
+
+
+async def _report_progress(bot, job: BroadcastJob, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        # only the file write runs in the thread; it is finished even when
+        # cancelled, so the final save in run_broadcast always comes last
+        write = asyncio.ensure_future(asyncio.to_thread(atomic_write_text, BROADCAST_CURSOR_FILE, job.cursor_json()))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            await write
+            raise
+        try:
+            await bot.edit_message_text(
+                chat_id=job.admin_chat, message_id=job.status_message_id, text=job.progress_text()
+            )
+        except Exception as e:
+            logger.warning(f"Не удалось обновить прогресс рассылки: {e}")
+
+
+async def run_broadcast(bot, job: BroadcastJob, sender: BulkSender | None = None,
+                        progress_interval: float = BROADCAST_PROGRESS_INTERVAL) -> None:
+    """Send the broadcast (or its rest), reporting progress to the admin. Works with any bot object."""
+    sender = sender or BulkSender(bot)
+    if job.status_message_id is None:
+        status = await bot.send_message(chat_id=job.admin_chat, text=job.progress_text())
+        job.status_message_id = status.message_id
+    job.save_cursor()
+
+    messages = [(chat_id, job.text) for chat_id in job.chat_ids]
+    reporter = asyncio.create_task(_report_progress(bot, job, progress_interval))
+    try:
+        await sender.run(messages, job.record, job.remaining())
+    finally:
+        # also on cancel (shutdown): the next start resumes from here
+        reporter.cancel()
+        try:
+            await reporter
+        except asyncio.CancelledError:
+            pass
+        job.save_cursor()
+
+    await bot.send_message(chat_id=job.admin_chat, text=job.report_text())
+    job.clear()
+
+
+# Broadcast running in the background of this process
+_task: asyncio.Task | None = None
+
+
+def broadcast_running() -> bool:
+    return _task is not None and not _task.done()
+
+
+def start_broadcast(bot, job: BroadcastJob) -> None:
+    global _task
+    _task = asyncio.get_running_loop().create_task(run_broadcast(bot, job))
+
+
+# Resume a broadcast interrupted by a restart (job queue, once on start)
+async def resume_broadcast(context: ContextTypes.DEFAULT_TYPE):
+    job = BroadcastJob.load()
+    if job is None or broadcast_running():
+        return
+    logger.info(f"Resuming broadcast at {job.done} of {len(job.chat_ids)}")
+    await context.bot.send_message(
+        chat_id=job.admin_chat,
+        text=f"🔁 Продолжаю прерванную рассылку: осталось {len(job.chat_ids) - job.done}"
+    )
+    start_broadcast(context.bot, job)
+
+
+# Stop sending before the bot shuts down, progress stays on disk
+async def stop_broadcast(app) -> None:
+    if broadcast_running():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+
+
 async def broadcast_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["in_broadcast"] = True
     if update.effective_user.id != ADMIN_ID:
@@ -20,39 +200,29 @@ async def broadcast_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 
 async def broadcast_send(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    text = update.message.text
-    store = load_store()      # get users we've recorded before
-    failed = []
-    skipped = 0
-    total_sent = 0
-    
-    for uid, user_data in store["users"].items():
-        # Skip banned users
-        if user_data.get("banned", False):
-            skipped += 1
-            continue
-            
-        try:
-            await context.bot.send_message(chat_id=int(uid), text=text)
-            total_sent += 1
-        except Exception as e:
-            logger.error(f"Ошибка при отправке сообщения пользователю {uid}: {e}")
-            failed.append(uid)
-    
-    msg = f"✅ Рассылка успешно отправлена!\n"
-    msg += f"• Отправлено: {total_sent} пользователям\n"
-    msg += f"• Пропущено (забанено): {skipped}"
-    
-    if failed:
-        msg += f"\n\n❌ Не удалось доставить сообщения пользователям: {', '.join(failed)}"
-    
-    await update.message.reply_text(msg)
     context.user_data.pop("in_broadcast", None)
     context.user_data["just_done"] = True
+    if broadcast_running():
+        await update.message.reply_text("⏳ Предыдущая рассылка еще идет, дождитесь отчета.")
+        return ConversationHandler.END
+
+    # get users we've recorded before, skip banned users
+    indexes = get_indexes()
+    recipients = indexes.all - indexes["banned"]
+    chat_ids = sorted(int(uid) for uid in recipients)
+    skipped = len(indexes.all) - len(recipients)
+
+    job = BroadcastJob(text=update.message.text, chat_ids=chat_ids,
+                       admin_chat=update.effective_chat.id, skipped=skipped)
+    job.save()
+    await update.message.reply_text(
+        f"🚀 Рассылка запущена: {len(chat_ids)} получателей. Прогресс и отчет придут сюда."
+    )
+    start_broadcast(context.bot, job)
     return ConversationHandler.END
 
 
 async def broadcast_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Рассылка отменена.")
     context.user_data.pop("in_broadcast", None)
-    return ConversationHandler.END
\ No newline at end of file
+    return ConversationHandler.END
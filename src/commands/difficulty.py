@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.storage.store import user_session, clear_notification_flag
+from src.decorators.storesession import store_session
+from src.decorators.checkban import check_ban_status
+from src.main.config import DEFAULT_DIFFICULTY
+from src.main.constants import DIFFICULTY_CHOICES
+from src.game.dictionary import get_dictionary
+from src.game.difficulty import update_difficulty
+from src.languages.russian import MSG_DIFFICULTY_STATE, MSG_DIFFICULTY_UNAVAILABLE, DIFFICULTY_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+def user_difficulty(user: dict | None) -> str:
+    level = (user or {}).get("difficulty", DEFAULT_DIFFICULTY)
+    return level if level in DIFFICULTY_CHOICES else "any"
+
+
+# Job: recompute missing or stale difficulty scores (at startup and after a dictionary reload)
+async def refresh_difficulty(context: ContextTypes.DEFAULT_TYPE):
+    try:
+        await asyncio.to_thread(update_difficulty)
+    except Exception:
+        logger.exception("Could not compute difficulty scores, secrets are picked from all words")
+
+
+@store_session
+@check_ban_status
+async def difficulty_toggle(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    session = user_session(context)
+    clear_notification_flag(session)
+    if not get_dictionary().has_difficulty():
+        await update.message.reply_text(MSG_DIFFICULTY_UNAVAILABLE)
+        return
+    user = session.get_or_create({"stats": {"games_played": 0, "wins": 0, "losses": 0}})
+    # Next level: any -> easy -> normal -> hard -> any
+    current = DIFFICULTY_CHOICES.index(user_difficulty(user))
+    level = DIFFICULTY_CHOICES[(current + 1) % len(DIFFICULTY_CHOICES)]
+    user["difficulty"] = level
+    session.mark_dirty()
+    await update.message.reply_text(
+        MSG_DIFFICULTY_STATE.format(level=DIFFICULTY_NAMES[level])
+    )
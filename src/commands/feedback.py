@@ -4,9 +4,11 @@ from telegram.ext import (
     ConversationHandler,
 )
 
-from src.storage.store import load_store, save_store, load_suggestions, save_suggestions, clear_notification_flag
+from src.storage.store import user_session, load_suggestions, save_suggestions, clear_notification_flag
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.game.logic import WORDLIST, normalize
+from src.game.logic import normalize
+from src.game.dictionary import get_dictionary
 from src.main.config import SUGGESTIONS_FILE
 from src.main.constants import FEEDBACK_CHOOSE, FEEDBACK_WORD, GUESSING, ASK_LENGTH
 from src.languages.russian import (FB_ONLY_OUTSIDE_GAME, BLACK_LIST_BUTTON, WHITE_LIST_BUTTON,
@@ -18,11 +20,12 @@ from src.languages.russian import (FB_ONLY_OUTSIDE_GAME, BLACK_LIST_BUTTON, WHIT
 )
 
 
+@store_session
 @check_ban_status
 async def feedback_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    store = load_store()
-    u = store["users"].get(str(update.effective_user.id), {})
-    clear_notification_flag(str(update.effective_user.id))
+    session = user_session(context)
+    clear_notification_flag(session)
+    u = session.user or {}
     if "current_game" in u or context.user_data.get("game_active"):
         await update.message.reply_text(
             FB_ONLY_OUTSIDE_GAME,
@@ -44,6 +47,7 @@ async def feedback_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return FEEDBACK_CHOOSE
 
 
+@store_session
 @check_ban_status
 async def feedback_choose(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text.strip()
@@ -68,6 +72,7 @@ async def feedback_choose(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return FEEDBACK_WORD
 
 
+@store_session
 @check_ban_status
 async def feedback_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
     word = normalize(replace_yo(update.message.text))
@@ -87,20 +92,18 @@ async def feedback_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Black list: add only if word is in dictionary
     if target == "black":
-        if word in WORDLIST:
+        if get_dictionary().is_main(word):
             suggestions["black"].add(word)
             save_suggestions(suggestions)
             
             # Add word to user profile
-            store = load_store()
-            user_id = str(update.effective_user.id)
-            if user_id not in store["users"]:
-                store["users"][user_id] = {}
-            if "suggested_words" not in store["users"][user_id]:
-                store["users"][user_id]["suggested_words"] = []
-            if word not in store["users"][user_id]["suggested_words"]:
-                store["users"][user_id]["suggested_words"].append(word)
-                save_store(store)
+            session = user_session(context)
+            user = session.get_or_create({})
+            if "suggested_words" not in user:
+                user["suggested_words"] = []
+            if word not in user["suggested_words"]:
+                user["suggested_words"].append(word)
+                session.mark_dirty()
                 
             resp = MSG_ADD_BLACK_LIST
         else:
@@ -108,24 +111,22 @@ async def feedback_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # White list: add only if word is not in dictionary and length is 4-11
     else:
-        if 4 <= len(word) <= 11 and word not in WORDLIST:
+        if 4 <= len(word) <= 11 and not get_dictionary().is_main(word):
             suggestions["white"].add(word)
             save_suggestions(suggestions)
             
             # Add word to user profile
-            store = load_store()
-            user_id = str(update.effective_user.id)
-            if user_id not in store["users"]:
-                store["users"][user_id] = {}
-            if "suggested_words" not in store["users"][user_id]:
-                store["users"][user_id]["suggested_words"] = []
-            if word not in store["users"][user_id]["suggested_words"]:
-                store["users"][user_id]["suggested_words"].append(word)
-                save_store(store)
+            session = user_session(context)
+            user = session.get_or_create({})
+            if "suggested_words" not in user:
+                user["suggested_words"] = []
+            if word not in user["suggested_words"]:
+                user["suggested_words"].append(word)
+                session.mark_dirty()
                 
             resp = MSG_ADD_WHITE_LIST
         else:
-            if word in WORDLIST:
+            if get_dictionary().is_main(word):
                 resp = MSG_DENIED_WHITE_LIST_ALREADY_HAVE
             elif not (4 <= len(word) <= 11):
                 resp = MSG_DENIED_WHITE_LIST_LENGHT
@@ -136,6 +137,7 @@ async def feedback_word(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
+@store_session
 @check_ban_status
 async def feedback_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
@@ -143,6 +145,7 @@ async def feedback_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
+@store_session
 @check_ban_status
 async def block_during_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # block any other input
@@ -151,12 +154,14 @@ async def block_during_feedback(update: Update, context: ContextTypes.DEFAULT_TY
     return context.user_data.get("feedback_state", FEEDBACK_CHOOSE)
 
 
+@store_session
 @check_ban_status
 async def feedback_not_allowed_ask(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(FB_ONLY_OUTSIDE_GAME)
     return ASK_LENGTH
 
 
+@store_session
 @check_ban_status
 async def feedback_not_allowed_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(FB_ONLY_OUTSIDE_GAME)
@@ -1,27 +1,30 @@
-import json
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
 from telegram.ext import ContextTypes, ConversationHandler
 
-from src.storage.store import load_store, save_store, load_suggestions, save_suggestions
+from src.storage.store import user_session, load_global, save_global, load_suggestions, save_suggestions
+from src.storage.leaderboard import get_leaderboard, display_name
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.game.logic import WORDLIST, normalize
-from src.game.render import render_full_board_with_keyboard
-from src.main.config import BASE_FILE
-from src.main.constants import GUESSING
+from src.game.logic import normalize
+from src.game.dictionary import get_dictionary
+from src.game.candidates import update_candidates
+from src.game.render import render_board, evict_render_state, board_filename
+from src.main.constants import GUESSING, MAX_ATTEMPTS
 from src.languages.russian import (SPACE_ATTENTION, MSG_LENGTH_VALIDATE, 
                                    SUGGESTION_SUGGESTED_NOW, SUGGESTED_ADD_WORD, 
-                                   MSG_NOT_FOUND, MSG_ATTEMPT, pluralize_attempt,
+                                   MSG_NOT_FOUND, MSG_ATTEMPT, MSG_CANDIDATES_LEFT, pluralize_attempt,
                                    MSG_WIN, MSG_GAME_OVER, START_AND_PLAY_NOT_WORK,
                                    MSG_SUGGESTION_ADDED, replace_yo
 ) 
 
+@store_session
 @check_ban_status
 async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = str(update.effective_user.id)
-    store   = load_store()
-    user    = store["users"].setdefault(user_id, {
+    session = user_session(context)
+    user_id = session.user_id
+    user    = session.get_or_create({
         "first_name": update.effective_user.first_name,
         "stats": {"games_played": 0, "wins": 0, "losses": 0}
     })
@@ -50,22 +53,15 @@ async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return GUESSING
     
     # Check if user has suggested this word before
-    user_id = str(update.effective_user.id)
-    user = store["users"].get(user_id, {})
+    dictionary = get_dictionary()
     suggested_words = user.get("suggested_words", [])
     
-    if normalized_guess in suggested_words and normalized_guess not in WORDLIST:
+    if normalized_guess in suggested_words and not dictionary.is_main(normalized_guess):
         await update.message.reply_text(SUGGESTION_SUGGESTED_NOW)
         return GUESSING
     
     # Check word in main and additional lists
-    with BASE_FILE.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-        main_words = set(data.get("main", []))
-        additional_words = set(data.get("additional", []))
-        all_words = main_words | additional_words
-    
-    if normalized_guess not in all_words:
+    if normalized_guess not in dictionary:
         # Suggest adding word to whitelist
         keyboard = [
             [
@@ -89,18 +85,24 @@ async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Save the move
     cg["guesses"].append(guess)
     cg["attempts"] += 1
-    save_store(store)
+    # secrets still consistent with every guess so far
+    candidates_left = update_candidates(cg, dictionary)
+    session.mark_dirty()
 
     # Render board with 6 rows + mini-keyboard at the bottom
-    img_buf = render_full_board_with_keyboard(
+    img_buf = await render_board(
         guesses=cg["guesses"],
         secret=secret,
-        total_rows=6,
-        max_width_px=1080
+        total_rows=MAX_ATTEMPTS,
+        max_width_px=1080,
+        state_key=user_id
     )
+    caption = MSG_ATTEMPT.format(attempt=cg['attempts'], max_attempts=MAX_ATTEMPTS)
+    if guess != secret and cg["attempts"] < MAX_ATTEMPTS:
+        caption += "\n" + MSG_CANDIDATES_LEFT.format(count=candidates_left)
     await update.message.reply_photo(
-        photo=InputFile(img_buf, filename="wordle_board.png"),
-        caption=MSG_ATTEMPT.format(attempt=cg['attempts'])
+        photo=InputFile(img_buf, filename=board_filename()),
+        caption=caption
     )
 
     # —— Victory ——
@@ -110,20 +112,21 @@ async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
         stats["wins"] += 1
         stats["win_rate"] = stats["wins"] / stats["games_played"]
 
-        g = store["global"]
+        # global stats are shared: no await between load and save
+        g = load_global()
         g["total_games"] += 1
         g["total_wins"] += 1
         g["win_rate"] = g["total_wins"] / g["total_games"]
 
-        top_uid, top_data = max(
-            store["users"].items(),
-            key=lambda kv: kv[1]["stats"]["wins"]
-        )
-        store["global"]["top_player"] = {
+        board = get_leaderboard()
+        board.update(user_id, stats["wins"], display_name(user))
+        top_uid, top_wins, top_name = board.top(1)[0]
+        g["top_player"] = {
             "user_id":  top_uid,
-            "username": top_data.get("username") or top_data.get("first_name", ""),
-            "wins":     top_data["stats"]["wins"]
+            "username": top_name,
+            "wins":     top_wins
         }
+        save_global(g)
 
         attempts = cg['attempts']
         attempt_word = pluralize_attempt(attempts)
@@ -133,43 +136,46 @@ async def handle_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
         del user["current_game"]
+        evict_render_state(user_id)
         context.user_data.pop("game_active", None)
         context.user_data["just_done"] = True
-        save_store(store)
         return ConversationHandler.END
 
     # —— Defeat ——
-    if cg["attempts"] >= 6:
+    if cg["attempts"] >= MAX_ATTEMPTS:
         stats = user["stats"]
         stats["games_played"] += 1
         stats["losses"] += 1
         stats["win_rate"] = stats["wins"] / stats["games_played"]
 
-        g = store["global"]
+        g = load_global()
         g["total_games"] += 1
         g["total_losses"] += 1
         g["win_rate"] = g["total_wins"] / g["total_games"]
+        save_global(g)
 
         await update.message.reply_text(
             MSG_GAME_OVER.format(secret=secret)
         )
 
         del user["current_game"]
+        evict_render_state(user_id)
         context.user_data.pop("game_active", None)
         context.user_data["just_done"] = True
-        save_store(store)
         return ConversationHandler.END
 
     # Game continues
     return GUESSING
 
 
+@store_session
 @check_ban_status
 async def ignore_guess(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(START_AND_PLAY_NOT_WORK)
     return GUESSING
 
 
+@store_session
 @check_ban_status
 async def suggest_white_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Handler for clicking the button to suggest a word to the whitelist
@@ -178,19 +184,16 @@ async def suggest_white_callback(update: Update, context: ContextTypes.DEFAULT_T
     
     # Extract word from callback_data and normalize it
     word = normalize(replace_yo(query.data.split(':', 1)[1]))
-    user_id = str(update.effective_user.id)
     
-    # Load current suggestions and main dictionary
+    # Load current suggestions
     current_suggestions = load_suggestions()
-    with BASE_FILE.open("r", encoding="utf-8") as f:
-        base_words = set(json.load(f))
     
     # Load user data
-    store = load_store()
-    user = store["users"].get(user_id, {})
+    session = user_session(context)
+    user = session.get_or_create({})
     
     # Add word to whitelist suggestions if it's not there yet
-    if word not in current_suggestions["white"] and word not in base_words:
+    if word not in current_suggestions["white"] and word not in get_dictionary():
         current_suggestions["white"].add(word)
         save_suggestions(current_suggestions)
         # Update global variable
@@ -203,7 +206,7 @@ async def suggest_white_callback(update: Update, context: ContextTypes.DEFAULT_T
     
     if word not in user["suggested_words"]:
         user["suggested_words"].append(word)
-        save_store(store)
+        session.mark_dirty()
     
     # Update message, removing the button
     await query.edit_message_text(
@@ -1,21 +1,22 @@
+import asyncio
 import random
-from collections import Counter
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from src.storage.store import load_store, save_store, clear_notification_flag
+from src.storage.store import user_session, clear_notification_flag
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.game.logic import WORDLIST
-from src.main.constants import GUESSING, ASK_LENGTH
+from src.game.dictionary import get_dictionary
+from src.game.solver import smart_hint
+from src.main.config import HINT_MODE, HINT_TIME_BUDGET_MS
+from src.main.constants import GUESSING, ASK_LENGTH, HINT_LETTERS
 from src.languages.russian import ONLY_IN_GAME, HINT_USED, HINT_NOT_FIND, MSG_HINT
 
+@store_session
 @check_ban_status
 async def hint(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = str(update.effective_user.id)
-    store = load_store()
-    user_entry = store["users"].setdefault(user_id, {
-        "stats": {"games_played": 0, "wins": 0, "losses": 0}
-    })
+    session = user_session(context)
+    user_entry = session.user or {}
 
     if "current_game" not in user_entry:
         await update.message.reply_text(ONLY_IN_GAME)
@@ -31,31 +32,29 @@ async def hint(update: Update, context: ContextTypes.DEFAULT_TYPE):
     secret = cg["secret"]
     length = len(secret)
 
-    # How many letters to hint
-    hint_counts = {4:1, 5:2, 6:2, 7:3, 8:3, 9:4, 10:4, 11:5}
-    num_letters = hint_counts.get(length, 1)
+    dictionary = get_dictionary()
+    hint_word = None
+    if HINT_MODE == "smart":
+        # NumPy work in a thread, bounded by the per-length budget
+        budget = HINT_TIME_BUDGET_MS.get(length, 150) / 1000
+        hint_word = await asyncio.to_thread(smart_hint, cg, dictionary, budget)
 
-    secret_counter = Counter(secret)
+    if hint_word is None:
+        # How many letters to hint
+        num_letters = HINT_LETTERS.get(length, 1)
 
-    # Select candidates
-    candidates = []
-    for w in WORDLIST:
-        if len(w) != length or w == secret:
-            continue
-        w_counter = Counter(w)
-        common = sum(min(secret_counter[ch], w_counter[ch]) for ch in w_counter)
-        if common == num_letters:
-            candidates.append(w)
+        # Select candidates
+        candidates = dictionary.common_letter_words(secret, num_letters)
 
-    if not candidates:
-        await update.message.reply_text(HINT_NOT_FIND)
-        return GUESSING
+        if not candidates:
+            await update.message.reply_text(HINT_NOT_FIND)
+            return GUESSING
 
-    hint_word = random.choice(candidates)
+        hint_word = random.choice(candidates)
 
     # Mark in JSON that hint was used
     cg["hint_used"] = True
-    save_store(store)
+    session.mark_dirty()
 
     await update.message.reply_text(
         MSG_HINT.format(hint_word=hint_word)
@@ -63,10 +62,11 @@ async def hint(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return GUESSING
 
 
+@store_session
 @check_ban_status
 async def hint_not_allowed(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Message shown when /hint is called outside of a game.
-    clear_notification_flag(str(update.effective_user.id))
+    clear_notification_flag(user_session(context))
     await update.message.reply_text(ONLY_IN_GAME)
     # if we're currently choosing length — stay in ASK_LENGTH, otherwise in GUESSING
     return context.user_data.get("state", ASK_LENGTH)
\ No newline at end of file
@@ -2,7 +2,11 @@ import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.storage.store import load_store, save_store, clear_notification_flag
+from src.storage.store import (load_user, load_users, save_user, user_ids_in,
+                               user_session, clear_notification_flag)
+from src.storage.locks import user_lock
+from src.main.sender import BulkSender
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
 from src.languages.russian import MSG_WAKE_UP, MSG_NOTIFICATIONS_STATE, STATE_OFF, STATE_ON
 
@@ -13,46 +17,53 @@ async def send_unfinished_games(context: ContextTypes.DEFAULT_TYPE):
     Sends a reminder to users who have notifications enabled for unfinished games,
     but only if the user hasn't responded since the last reminder.
     After sending, sets a flag to prevent further notifications until the user plays or sends a message.
+    Reminders go through the shared rate-limited sender; the write-behind store batches the flags.
     """
-    store = load_store()
-
-    for uid, udata in store["users"].items():
-        # notifications are disabled
-        if not udata.get("notify_on_wakeup", True):
-            continue
-        # user has no unfinished game
-        if "current_game" not in udata:
-            continue
+    messages = []
+    # only users with an unfinished game and notifications enabled
+    candidates = user_ids_in("active_game") & user_ids_in("notify")
+    for uid, udata in load_users(sorted(candidates)).items():
         # if already sent and user hasn't responded — skip
         if udata.get("notified", False):
             continue
 
-        # Send reminder
         cg = udata["current_game"]
         length = len(cg["secret"])
         attempts = cg["attempts"]
-        text = MSG_WAKE_UP.format(length=length, attempts=attempts)
-        try:
-            await context.bot.send_message(chat_id=int(uid), text=text)
-        except Exception as e:
-            logger.warning(f"Не смогли напомнить {uid}: {e}")
-            continue
+        messages.append((int(uid), MSG_WAKE_UP.format(length=length, attempts=attempts)))
+
+    notified = []
+
+    def on_result(index: int, error: str | None):
+        chat_id = messages[index][0]
+        if error is None:
+            notified.append(str(chat_id))
+        else:
+            logger.warning(f"Не смогли напомнить {chat_id}: {error}")
+
+    await BulkSender(context.bot).run(messages, on_result)
 
-        # Remember sending time
-        udata["notified"] = True
-        save_store(store)
+    # Remember sending on fresh copies under the user's lock: a handler still
+    # running for that user flushes its session first, never over our flag
+    for uid in notified:
+        async with user_lock(uid):
+            fresh = load_user(uid)
+            if fresh is not None:
+                fresh["notified"] = True
+                save_user(uid, fresh)
+    logger.info(f"Wake-up reminders: {len(notified)} sent, {len(messages) - len(notified)} failed")
 
 
+@store_session
 @check_ban_status
 async def notification_toggle(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    uid = str(update.effective_user.id)
-    store = load_store()
-    user = store["users"].setdefault(uid, {"stats": {...}})
-    clear_notification_flag(str(update.effective_user.id))
+    session = user_session(context)
+    clear_notification_flag(session)
+    user = session.get_or_create({"stats": {"games_played": 0, "wins": 0, "losses": 0}})
     # Toggle
     current = user.get("notify_on_wakeup", True)
     user["notify_on_wakeup"] = not current
-    save_store(store)
+    session.mark_dirty()
     state = STATE_ON if not current else STATE_OFF
     await update.message.reply_text(
         MSG_NOTIFICATIONS_STATE.format(state=state)
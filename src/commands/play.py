@@ -1,24 +1,27 @@
-import random
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.storage.store import load_store, save_store, clear_notification_flag, update_user_activity
-from src.main.constants import ASK_LENGTH, GUESSING
-from src.game.logic import WORDLIST
+from src.storage.store import user_session, clear_notification_flag, update_user_activity
+from src.main.constants import ASK_LENGTH, GUESSING, MAX_ATTEMPTS
+from src.game.dictionary import get_dictionary
+from src.commands.difficulty import user_difficulty
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
 from src.languages.russian import (GAME_CONTINUE, LETTERS_QUESTION, 
                                    NOT_FIND_WORDS, NEED_FIX_LETTERS, 
-                                   START_AND_PLAY_NOT_WORK, MSG_GAME_START
+                                   START_AND_PLAY_NOT_WORK, MSG_GAME_START,
+                                   pluralize_attempt
 )
 
+@store_session
 @check_ban_status
 async def ask_length(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["state"] = ASK_LENGTH
-    update_user_activity(update.effective_user)
-    clear_notification_flag(str(update.effective_user.id))
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
+    clear_notification_flag(session)
     context.user_data["game_active"] = True
-    store = load_store()
-    u = store["users"].get(str(update.effective_user.id), {})
+    u = session.user
     if "current_game" in u:
         cg = u["current_game"]
         context.user_data.update({
@@ -39,30 +42,30 @@ async def ask_length(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ASK_LENGTH
 
 
+@store_session
 @check_ban_status
 async def receive_length(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
     text = update.message.text.strip()
     if not text.isdigit() or not 4 <= int(text) <= 11:
         await update.message.reply_text(NEED_FIX_LETTERS)
         return ASK_LENGTH
 
     length = int(text)
-    candidates = [w for w in WORDLIST if len(w) == length]
-    if not candidates:
+    u = session.user
+    # O(1) pick from the user's difficulty bucket
+    secret = get_dictionary().random_word(length, user_difficulty(u))
+    if secret is None:
         await update.message.reply_text(NOT_FIND_WORDS)
         return ASK_LENGTH
 
-    secret = random.choice(candidates)
-    
-    store = load_store()
-    u = store["users"].setdefault(str(update.effective_user.id), {"stats": {"games_played":0,"wins":0,"losses":0}})
     u["current_game"] = {
         "secret": secret,
         "attempts": 0,
         "guesses": [],
     }
-    save_store(store)
+    session.mark_dirty()
 
     context.user_data["secret"] = secret
     context.user_data["length"] = length
@@ -71,12 +74,14 @@ async def receive_length(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["state"] = GUESSING
 
     await update.message.reply_text(
-        MSG_GAME_START.format(length=length)
+        MSG_GAME_START.format(length=length, max_attempts=MAX_ATTEMPTS,
+                              attempts_word=pluralize_attempt(MAX_ATTEMPTS))
     )
     
     return GUESSING
 
 
+@store_session
 @check_ban_status
 async def ignore_ask(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text(START_AND_PLAY_NOT_WORK)
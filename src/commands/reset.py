@@ -1,28 +1,32 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from src.storage.store import load_store, save_store, clear_notification_flag, update_user_activity
+from src.storage.store import user_session, clear_notification_flag, update_user_activity
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
+from src.game.render import evict_render_state
 from src.languages.russian import MSG_RESET, MSG_RESET_DENIED
 
+@store_session
 @check_ban_status
 async def reset(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
 
-    store = load_store()
-    uid = str(update.effective_user.id)
-    user = store["users"].get(uid)
-    if user and "current_game" in user:
+    user = session.user
+    if "current_game" in user:
         del user["current_game"]
-        save_store(store)
+    evict_render_state(session.user_id)
 
     context.user_data.clear()
     await update.message.reply_text(MSG_RESET)
     return ConversationHandler.END
 
 
+@store_session
 @check_ban_status
 async def reset_global(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
-    clear_notification_flag(str(update.effective_user.id))
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
+    clear_notification_flag(session)
     await update.message.reply_text(MSG_RESET_DENIED)
\ No newline at end of file
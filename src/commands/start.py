@@ -1,17 +1,19 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.storage.store import load_store, update_user_activity, clear_notification_flag
+from src.storage.store import user_session, update_user_activity, clear_notification_flag
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.main.constants import GUESSING
-from src.languages.russian import START_MESSENGE, GAME_CONTINUE
+from src.main.constants import GUESSING, MAX_ATTEMPTS
+from src.languages.russian import START_MESSENGE, GAME_CONTINUE, pluralize_attempt
 
+@store_session
 @check_ban_status
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
-    store = load_store()
-    u = store["users"].get(str(update.effective_user.id), {})
-    clear_notification_flag(str(update.effective_user.id))
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
+    clear_notification_flag(session)
+    u = session.user
     if "current_game" in u:
         cg = u["current_game"]
         context.user_data.update({
@@ -29,4 +31,6 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return GUESSING
 
     
-    await update.message.reply_text(START_MESSENGE)
\ No newline at end of file
+    await update.message.reply_text(
+        START_MESSENGE.format(max_attempts=MAX_ATTEMPTS, attempts_word=pluralize_attempt(MAX_ATTEMPTS))
+    )
\ No newline at end of file
@@ -1,17 +1,21 @@
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
-from src.storage.store import load_store, update_user_activity, clear_notification_flag
+from src.storage.store import user_session, load_global, update_user_activity, clear_notification_flag
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.languages.russian import ONLY_OUTSIDE_GAME, MSG_STATS, MSG_GLOBAL_STATS, MSG_TOP_PLAYER
+from src.storage.leaderboard import get_leaderboard
+from src.main.config import LEADERBOARD_SIZE
+from src.languages.russian import (ONLY_OUTSIDE_GAME, MSG_STATS, MSG_GLOBAL_STATS, MSG_TOP_PLAYER,
+                                   MSG_LEADERBOARD, MSG_LEADERBOARD_LINE, MSG_YOUR_RANK)
 
+@store_session
 @check_ban_status
 async def my_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
-    store = load_store()
-    uid = str(update.effective_user.id)
-    user = store["users"].get(uid)
-    if not user or "current_game" in user:
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
+    user = session.user
+    if "current_game" in user:
         await update.message.reply_text(ONLY_OUTSIDE_GAME)
         return
     s = user.get("stats", {})
@@ -26,16 +30,16 @@ async def my_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
 )
 
 
+@store_session
 @check_ban_status
 async def global_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    update_user_activity(update.effective_user)
-    store = load_store()
-    g = store["global"]
-    uid = str(update.effective_user.id)
-    user = store["users"].get(uid)
-    if user and "current_game" in user:
+    session = user_session(context)
+    update_user_activity(session, update.effective_user)
+    user = session.user
+    if "current_game" in user:
         await update.message.reply_text(ONLY_OUTSIDE_GAME)
         return
+    g = load_global()
     
     tp = g.get("top_player", {})
     if tp:
@@ -46,21 +50,38 @@ async def global_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         top_line = ""
 
+    board = get_leaderboard()
+    top = board.top(LEADERBOARD_SIZE)
+    if top:
+        lines = "".join(
+            MSG_LEADERBOARD_LINE.format(place=board.rank(uid), username=name, wins=wins)
+            for uid, wins, name in top
+        )
+        leaderboard = MSG_LEADERBOARD.format(count=len(top), lines=lines)
+    else:
+        leaderboard = ""
+
+    rank = board.rank(session.user_id)
+    rank_line = MSG_YOUR_RANK.format(rank=rank, total=len(board)) if rank else ""
+
     await update.message.reply_text(
         MSG_GLOBAL_STATS.format(
             total_games=g.get('total_games', 0),
             total_wins=g.get('total_wins', 0),
             total_losses=g.get('total_losses', 0),
             win_rate=g.get('win_rate', 0.0) * 100,
-            top_line=top_line
+            top_line=top_line,
+            leaderboard=leaderboard,
+            rank_line=rank_line
         ),
         parse_mode="Markdown"
     )
 
 
+@store_session
 @check_ban_status
 async def only_outside_game(update, context):
-    clear_notification_flag(str(update.effective_user.id))
+    clear_notification_flag(user_session(context))
     await update.message.reply_text(ONLY_OUTSIDE_GAME)
     # вернем то состояние, в котором сейчас юзер:
     return context.user_data.get("state", ConversationHandler.END)
\ No newline at end of file
@@ -6,13 +6,27 @@ from telegram.ext import (
     ConversationHandler,
 )
 
-from src.storage.store import load_store, save_store, load_suggestions, save_suggestions
+from src.storage.store import has_active_game, update_users, load_suggestions, save_suggestions
+from src.storage.files import atomic_write_text
 from src.main.config import ADMIN_ID, BASE_FILE
 from src.main.constants import REMOVE_INPUT
-from src.game.logic import WORDLIST
+from src.game.dictionary import reload_dictionary
+from src.game.logic import is_game_word
+from src.commands.difficulty import refresh_difficulty
 
 logger = logging.getLogger(__name__)
 
+
+# Remove words from the user's suggested list, returns how many were removed
+def _drop_suggested(user_data: dict, words: set[str]) -> int:
+    suggested = user_data.get("suggested_words")
+    if not suggested:
+        return 0
+    kept = [w for w in suggested if w not in words]
+    user_data["suggested_words"] = kept
+    return len(suggested) - len(kept)
+
+
 async def suggestions_view(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user.id != ADMIN_ID:
         return
@@ -35,9 +49,7 @@ async def suggestions_move_start(update: Update, context: ContextTypes.DEFAULT_T
     if update.effective_user.id != ADMIN_ID:
         return
 
-    store = load_store()
-    u = store["users"].get(str(update.effective_user.id), {})
-    if "current_game" in u or context.user_data.get("game_active"):
+    if has_active_game(str(update.effective_user.id)) or context.user_data.get("game_active"):
         await update.message.reply_text("Эту команду можно использовать только вне игры.")
         return ConversationHandler.END
 
@@ -92,9 +104,7 @@ async def suggestions_remove_start(update: Update, context: ContextTypes.DEFAULT
     if update.effective_user.id != ADMIN_ID:
         return
 
-    store = load_store()
-    u = store["users"].get(str(update.effective_user.id), {})
-    if "current_game" in u or context.user_data.get("game_active"):
+    if has_active_game(str(update.effective_user.id)) or context.user_data.get("game_active"):
         await update.message.reply_text("Эту команду можно использовать только вне игры.")
         return ConversationHandler.END
 
@@ -132,23 +142,11 @@ async def suggestions_remove_process(update: Update, context: ContextTypes.DEFAU
 
     save_suggestions(sugg)
     
-    store = load_store()
-    removed_count = 0
-    
     # Collect all removed words from all lists
     all_removed_words = set(removed["black"]) | set(removed["white"]) | set(removed["add"])
     
     # Go through all users and remove words from their lists
-    for user_id, user_data in store["users"].items():
-        if "suggested_words" in user_data:
-            before = len(user_data["suggested_words"])
-            user_data["suggested_words"] = [w for w in user_data["suggested_words"] 
-                                         if w not in all_removed_words]
-            removed_count += before - len(user_data["suggested_words"])
-    
-    # Save changes if anything was removed
-    if removed_count > 0:
-        save_store(store)
+    removed_count = await update_users(lambda user_data: _drop_suggested(user_data, all_removed_words), index="suggested")
     
     # form response
     parts = []
@@ -182,55 +180,55 @@ async def suggestions_approve(update: Update, context: ContextTypes.DEFAULT_TYPE
         main_words = set(data.get("main", []))
         additional_words = set(data.get("additional", []))
 
-    # 3. Remove "black" and add "white" and "add"
+    # 3. Remove "black" and add "white" and "add"; words with letters outside
+    # the Russian alphabet (Latin, Ukrainian...) are rejected
+    rejected = sorted(w for w in sugg["white"] | sugg["add"] if not is_game_word(w))
+    if rejected:
+        logger.warning(f"Rejected suggestions outside the alphabet: {', '.join(rejected)}")
+    white = sugg["white"] - set(rejected)
+    add = sugg["add"] - set(rejected)
     main_words -= sugg["black"]
-    main_words |= sugg["white"]
-    additional_words |= sugg["add"]
+    main_words |= white
+    additional_words |= add
 
-    # 4. Filter by criteria (letters only, length 4-11) and sort
-    filtered_main = [w for w in main_words if w.isalpha() and 4 <= len(w) <= 11]
+    # 4. Filter by criteria (Russian letters only, length 4-11) and sort
+    filtered_main = [w for w in main_words if is_game_word(w)]
     filtered_main.sort()
-    filtered_additional = [w for w in additional_words if w.isalpha() and 4 <= len(w) <= 11]
+    filtered_additional = [w for w in additional_words if is_game_word(w)]
     filtered_additional.sort()
 
     # 5. Save back to base_words.json
-    with BASE_FILE.open("w", encoding="utf-8") as f:
-        json.dump({"main": filtered_main, "additional": filtered_additional}, f, ensure_ascii=False, indent=2)
+    atomic_write_text(
+        BASE_FILE,
+        json.dumps({"main": filtered_main, "additional": filtered_additional}, ensure_ascii=False, indent=2)
+    )
 
     logger.info(f"-> Wrote {len(filtered_main)} main words and {len(filtered_additional)} additional words to {BASE_FILE.resolve()}")
 
-    # 6. Update global list in memory
-    global WORDLIST
-    WORDLIST = filtered_main
+    # 6. Swap the in-memory dictionary, recompute difficulty of the changed lengths
+    reload_dictionary()
+    context.job_queue.run_once(refresh_difficulty, when=0)
 
     # 7. Remove approved words from users' suggested lists
-    store = load_store()
-    removed_count = 0
-    
     # Collect all approved words (whitelist and add list)
     approved_words = sugg["white"] | sugg["add"]
     blacklisted_words = sugg["black"]
     
     # Go through all users and remove approved words from their lists
-    for user_id, user_data in store["users"].items():
-        if "suggested_words" in user_data:
-            before = len(user_data["suggested_words"])
-            user_data["suggested_words"] = [
-                w for w in user_data["suggested_words"] 
-                if w not in approved_words and w not in blacklisted_words
-            ]
-            removed_count += before - len(user_data["suggested_words"])
-    
-    # Save changes if anything was removed
-    if removed_count > 0:
-        save_store(store)
+    removed_count = await update_users(
+        lambda user_data: _drop_suggested(user_data, approved_words | blacklisted_words),
+        index="suggested"
+    )
 
     # 8. Clear suggestions.json
     save_suggestions({"black": set(), "white": set(), "add": set()})
 
     # 9. Reply to admin
-    await update.message.reply_text(
-        f"Словарь пересобран: +{len(sugg['white'])}, +{len(sugg['add'])}, -{len(sugg['black'])}.\n"
+    msg = (
+        f"Словарь пересобран: +{len(white)}, +{len(add)}, -{len(sugg['black'])}.\n"
         f"Удалено {removed_count} слов (одобренные и черный список) из профилей пользователей.\n"
         "Предложения очищены."
-    )
\ No newline at end of file
+    )
+    if rejected:
+        msg += f"\nОтклонены (не русские буквы): {', '.join(rejected)}"
+    await update.message.reply_text(msg)
\ No newline at end of file
@@ -1,13 +1,15 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.decorators.storesession import store_session
 from src.decorators.checkban import check_ban_status
-from src.storage.store import clear_notification_flag
+from src.storage.store import user_session, clear_notification_flag
 from src.languages.russian import MSG_UNKNOWN
 
+@store_session
 @check_ban_status
 async def unknown_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    clear_notification_flag(str(update.effective_user.id))
+    clear_notification_flag(user_session(context))
     if context.user_data.get("game_active") or context.user_data.get("in_feedback") or context.user_data.get("in_remove"):
         return
     if context.user_data.pop("just_done", False):
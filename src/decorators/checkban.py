@@ -3,7 +3,7 @@ from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 import logging
 
-from src.storage.store import load_store, save_store
+from src.storage.store import is_banned, was_unbanned, clear_unbanned, user_session
 from src.languages.russian import BAN_REMINDER_MESSENGE
 
 logger = logging.getLogger(__name__)
@@ -12,10 +12,8 @@ def check_ban_status(handler):
     @wraps(handler)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
         user_id = str(update.effective_user.id)
-        store = load_store()
-        user_data = store["users"].get(user_id, {})
         
-        if user_data.get("banned", False):
+        if await is_banned(user_id):
             try:
                 # Check if we've already sent a message in this update
                 if context.user_data.get("last_ban_update_id") != update.update_id:
@@ -31,9 +29,8 @@ def check_ban_status(handler):
                 return
         else:
             # If user was unbanned, clear their state on first message
-            if user_data.get("was_banned"):
+            if was_unbanned(user_id):
                 context.user_data.clear()
-                user_data.pop("was_banned", None)
-                save_store(store)
+                clear_unbanned(user_session(context))
         return await handler(update, context, *args, **kwargs)
     return wrapper
\ No newline at end of file
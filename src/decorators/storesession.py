@@ -0,0 +1,21 @@
+from functools import wraps
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from src.storage.store import open_session
+from src.storage.locks import user_lock
+
+
+# Open the store session of the update for the handler and write it back once at the end.
+# Runs under the user's lock, so two updates of one user never interleave their load and save.
+def store_session(handler):
+    @wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        # already held when updates come through PerUserUpdateProcessor
+        async with user_lock(update.effective_user.id):
+            session = open_session(context, update.effective_user.id, update.update_id)
+            try:
+                return await handler(update, context, *args, **kwargs)
+            finally:
+                session.flush()
+    return wrapper
@@ -0,0 +1,116 @@
+"""
+Remaining-candidates tracker: which main words of the game's length are still
+consistent with all feedback so far, as a bitset over dictionary.words(length).
+"""
+import base64
+
+import numpy as np
+
+from src.game.logic import ALPHABET, encode_word, make_feedback
+from src.main.constants import GREEN, YELLOW
+
+
+class ConstraintIndex:
+    """
+    Bitsets (np.packbits, bit i is words(length)[i]) for one word length:
+    pos[p, c]      words with letter c at position p
+    at_least[c, k] words with at least k copies of letter c
+    Narrowing by one guess is a few ANDs of these rows.
+    """
+
+    def __init__(self, codes: np.ndarray):
+        n, length = codes.shape
+        self.size = n
+        self.length = length
+        letters = np.arange(len(ALPHABET))
+
+        self.pos = np.packbits(codes[:, :, None] == letters, axis=0).transpose(1, 2, 0).copy()
+
+        counts = np.zeros((n, len(ALPHABET)), dtype=np.uint8)
+        rows = np.arange(n)
+        for p in range(length):
+            counts[rows, codes[:, p]] += 1
+        # k = 0..length + 1, the last one is always empty
+        k = np.arange(length + 2)
+        self.at_least = np.packbits(counts[:, :, None] >= k, axis=0).transpose(1, 2, 0).copy()
+        self.full = self.at_least[0, 0].copy()
+
+    def narrow(self, bits: np.ndarray, guess: str, feedback: str) -> np.ndarray:
+        """Words of `bits` that would give `feedback` for `guess`."""
+        bits = bits.copy()
+        letters = encode_word(guess)
+        marked: dict[int, int] = {}   # letter -> greens + yellows
+        has_white: set[int] = set()
+        for p, (c, fb) in enumerate(zip(letters, feedback)):
+            if fb == GREEN:
+                bits &= self.pos[p, c]
+            else:
+                bits &= ~self.pos[p, c]
+            if fb in (GREEN, YELLOW):
+                marked[c] = marked.get(c, 0) + 1
+            else:
+                has_white.add(c)
+
+        for c in set(letters):
+            k = marked.get(c, 0)
+            bits &= self.at_least[c, k]
+            if c in has_white:
+                # a white copy means the secret has exactly k of them
+                bits &= ~self.at_least[c, k + 1]
+        return bits
+
+    @staticmethod
+    def count(bits: np.ndarray) -> int:
+        return int(np.bitwise_count(bits).sum())
+
+    def indices(self, bits: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(bits, count=self.size))
+
+
+def pack_bits(bits: np.ndarray) -> str:
+    return base64.b64encode(bits.tobytes()).decode("ascii")
+
+
+def unpack_bits(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.uint8).copy()
+
+
+def _narrowed(game: dict, dictionary) -> np.ndarray:
+    """Candidate bits after all guesses of the game, from the saved bits when they are current."""
+    secret = game["secret"]
+    index = dictionary.constraints(len(secret))
+    fingerprint = dictionary.fingerprint(len(secret))
+
+    saved = game.get("candidates")
+    if saved and saved.get("fp") == fingerprint and saved.get("n") == len(game["guesses"]):
+        return unpack_bits(saved["bits"])
+    if saved and saved.get("fp") == fingerprint and saved.get("n") == len(game["guesses"]) - 1:
+        bits = unpack_bits(saved["bits"])
+        new = game["guesses"][-1:]
+    else:
+        bits = index.full
+        new = game["guesses"]
+
+    for guess in new:
+        bits = index.narrow(bits, guess, make_feedback(secret, guess))
+    return bits
+
+
+def update_candidates(game: dict, dictionary) -> int:
+    """
+    Narrow game["candidates"] by the last guess and return how many words are left.
+    Rebuilt from all guesses when missing or made with another version of the word list.
+    Stored as {"fp": fingerprint, "n": guesses covered, "bits": base64 bitset} in current_game.
+    The secret always counts, even when it has left the main list mid-game.
+    """
+    secret = game["secret"]
+    length = len(secret)
+    bits = _narrowed(game, dictionary)
+    game["candidates"] = {"fp": dictionary.fingerprint(length), "n": len(game["guesses"]), "bits": pack_bits(bits)}
+    # a main-list secret is in the bitset (it matches its own feedback)
+    return dictionary.constraints(length).count(bits) + (0 if dictionary.is_main(secret) else 1)
+
+
+def candidate_indices(game: dict, dictionary) -> np.ndarray:
+    """Indices into dictionary.words(length) of the secrets still possible (game is not changed)."""
+    return dictionary.constraints(len(game["secret"])).indices(_narrowed(game, dictionary))
@@ -0,0 +1,119 @@
+"""
+Offline step: compile base_words.json into the artifact loaded at startup.
+
+    python -m src.game.compile_dictionary
+
+The artifact is UTF-8 text, one item per line, already normalized and sorted:
+
+    #wordle-dict <format version> <source size> <source mtime_ns>
+    @main <length> <count>     followed by <count> main words
+    @valid <length> <count>    followed by <count> main + additional words
+
+Loading it is a single split() and list slicing, no JSON parsing or sorting.
+
+Difficulty scores of the main words (src.game.difficulty) are kept next to it
+in an .npz: per length, the scores and the fingerprint of the list they belong to.
+"""
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.main.config import BASE_FILE, COMPILED_FILE, DIFFICULTY_FILE
+from src.game.logic import read_wordlist
+from src.storage.files import atomic_write_text
+
+FORMAT_VERSION = 1
+
+Groups = dict[int, tuple[str, ...]]
+
+
+def group_by_length(words) -> Groups:
+    groups: dict[int, list[str]] = {}
+    for w in sorted(words):
+        groups.setdefault(len(w), []).append(w)
+    return {length: tuple(ws) for length, ws in groups.items()}
+
+
+def source_stamp(source: Path) -> str:
+    st = source.stat()
+    return f"{st.st_size} {st.st_mtime_ns}"
+
+
+def compile_dictionary(source: Path = BASE_FILE, target: Path = COMPILED_FILE) -> tuple[Groups, Groups]:
+    """Normalize the source word lists and write the artifact. Returns (main, valid) groups."""
+    main, additional = read_wordlist(source)
+    main_groups = group_by_length(main)
+    valid_groups = group_by_length(set(main) | set(additional))
+
+    lines = [f"#wordle-dict {FORMAT_VERSION} {source_stamp(source)}"]
+    for name, groups in (("main", main_groups), ("valid", valid_groups)):
+        for length, words in sorted(groups.items()):
+            lines.append(f"@{name} {length} {len(words)}")
+            lines.extend(words)
+
+    # readers never see half a file
+    atomic_write_text(target, "\n".join(lines) + "\n")
+
+    return main_groups, valid_groups
+
+
+def read_compiled(path: Path = COMPILED_FILE, source: Path = BASE_FILE) -> tuple[Groups, Groups] | None:
+    """Return (main, valid) groups, or None if the artifact is missing or older than the source."""
+    try:
+        lines = path.read_text("utf-8").split("\n")
+    except FileNotFoundError:
+        return None
+
+    header = lines[0].split(" ", 2)
+    if header[:2] != ["#wordle-dict", str(FORMAT_VERSION)] or header[2:] != [source_stamp(source)]:
+        return None
+
+    sections: dict[str, dict[int, tuple[str, ...]]] = {"main": {}, "valid": {}}
+    i = 1
+    while i < len(lines) and lines[i]:
+        name, length, count = lines[i][1:].split(" ")
+        count = int(count)
+        sections[name][int(length)] = tuple(lines[i + 1:i + 1 + count])
+        i += 1 + count
+
+    return sections["main"], sections["valid"]
+
+
+def write_difficulty(scores: dict[int, tuple[str, np.ndarray]], path: Path = DIFFICULTY_FILE) -> None:
+    """Save {length: (fingerprint, scores)} atomically."""
+    arrays = {}
+    for length, (fingerprint, values) in scores.items():
+        arrays[f"fp_{length}"] = np.array(fingerprint)
+        arrays[f"scores_{length}"] = values
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_difficulty(path: Path = DIFFICULTY_FILE) -> dict[int, tuple[str, np.ndarray]]:
+    """{length: (fingerprint, scores)}, empty if the file is missing."""
+    try:
+        data = np.load(path)
+    except FileNotFoundError:
+        return {}
+    scores = {}
+    with data:
+        for key in data.files:
+            if key.startswith("fp_"):
+                length = key[3:]
+                scores[int(length)] = (str(data[key]), data[f"scores_{length}"])
+    return scores
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main_groups, valid_groups = compile_dictionary()
+    elapsed = (time.perf_counter() - start) * 1000
+    for length in sorted(valid_groups):
+        print(f"{length} букв: {len(main_groups.get(length, ()))} main, {len(valid_groups[length])} valid")
+    print(f"-> {COMPILED_FILE} ({COMPILED_FILE.stat().st_size} bytes) in {elapsed:.0f} ms")
@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import random
+import time
+from itertools import chain
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from src.main.config import DATA_DIR, PATTERN_TABLE_FILE, PATTERN_TABLE_LENGTHS
+from src.main.constants import DIFFICULTY_LEVELS
+from src.game.compile_dictionary import Groups, compile_dictionary, group_by_length, read_compiled, read_difficulty
+from src.game.logic import ALPHABET, PatternTable, encode_words, letter_vector
+from src.game.candidates import ConstraintIndex
+
+logger = logging.getLogger(__name__)
+
+class Dictionary:
+    """
+    Immutable snapshot of the word lists.
+    Main words are possible secrets, main + additional are accepted guesses.
+    """
+
+    def __init__(self, main_by_length: Groups, valid_by_length: Groups):
+        self._main_by_length = main_by_length
+        self._valid_by_length = valid_by_length
+        self.main = frozenset(chain.from_iterable(main_by_length.values()))
+        self.all = frozenset(chain.from_iterable(valid_by_length.values()))
+        # lazily built per-length arrays and per-secret hint results
+        self._codes: dict[int, np.ndarray] = {}
+        self._valid_codes: dict[int, np.ndarray] = {}
+        self._letter_counts: dict[int, np.ndarray] = {}
+        self._constraints: dict[int, ConstraintIndex] = {}
+        self._fingerprints: dict[int, str] = {}
+        self._pattern_tables: dict[int, PatternTable | None] = {}
+        self._difficulty: dict[int, tuple[str, np.ndarray]] | None = None
+        self._stale_difficulty: set[int] = set()
+        self._buckets: dict[int, tuple[np.ndarray, ...] | None] = {}
+        self._hint_cache: dict[tuple[str, int], Tuple[str, ...]] = {}
+
+    @classmethod
+    def from_lists(cls, main_words: Iterable[str], additional_words: Iterable[str]) -> "Dictionary":
+        main = frozenset(main_words)
+        return cls(group_by_length(main), group_by_length(main | frozenset(additional_words)))
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.all
+
+    def __len__(self) -> int:
+        return len(self.all)
+
+    def is_main(self, word: str) -> bool:
+        return word in self.main
+
+    def words(self, length: int) -> Tuple[str, ...]:
+        """Sorted main words (possible secrets) of the given length."""
+        return self._main_by_length.get(length, ())
+
+    def valid_words(self, length: int) -> Tuple[str, ...]:
+        """Sorted main + additional words (accepted guesses) of the given length."""
+        return self._valid_by_length.get(length, ())
+
+    def codes(self, length: int) -> np.ndarray:
+        """(n, length) letter indices of words(length), row i is words(length)[i]."""
+        codes = self._codes.get(length)
+        if codes is None:
+            codes = self._codes[length] = encode_words(self.words(length), length)
+        return codes
+
+    def valid_codes(self, length: int) -> np.ndarray:
+        """(n, length) letter indices of valid_words(length)."""
+        codes = self._valid_codes.get(length)
+        if codes is None:
+            codes = self._valid_codes[length] = encode_words(self.valid_words(length), length)
+        return codes
+
+    def constraints(self, length: int) -> ConstraintIndex:
+        """Bitset index over words(length) for the remaining-candidates tracker."""
+        index = self._constraints.get(length)
+        if index is None:
+            index = self._constraints[length] = ConstraintIndex(self.codes(length))
+        return index
+
+    def fingerprint(self, length: int) -> str:
+        """Short hash of words(length): bitsets over them are valid only for the same list."""
+        fp = self._fingerprints.get(length)
+        if fp is None:
+            digest = hashlib.blake2b("\n".join(self.words(length)).encode("utf-8"), digest_size=6)
+            fp = self._fingerprints[length] = digest.hexdigest()
+        return fp
+
+    def pattern_table_path(self, length: int):
+        """Table file of this length; its name depends on both word lists."""
+        digest = hashlib.blake2b("\n".join(self.valid_words(length)).encode("utf-8"), digest_size=6)
+        fingerprint = f"{self.fingerprint(length)}{digest.hexdigest()}"
+        return DATA_DIR / PATTERN_TABLE_FILE.format(length=length, fingerprint=fingerprint)
+
+    def pattern_table(self, length: int) -> PatternTable | None:
+        """Memory-mapped pattern table of the length, None if it was not built for these lists."""
+        if length not in self._pattern_tables:
+            table = None
+            if length in PATTERN_TABLE_LENGTHS:
+                table = PatternTable.load(self.pattern_table_path(length), self.valid_words(length), self.words(length))
+            self._pattern_tables[length] = table
+        return self._pattern_tables[length]
+
+    def difficulty(self, length: int) -> np.ndarray | None:
+        """Difficulty scores (0 easy .. 1 hard) of words(length), None if not computed for this list."""
+        if self._difficulty is None:
+            self._difficulty = read_difficulty()
+            if not self._difficulty:
+                logger.warning("Difficulty scores are missing, secrets are picked from all words until they are computed")
+        fingerprint, scores = self._difficulty.get(length, (None, None))
+        if fingerprint is None:
+            return None
+        if fingerprint != self.fingerprint(length) or len(scores) != len(self.words(length)):
+            if length not in self._stale_difficulty:
+                self._stale_difficulty.add(length)
+                logger.warning(f"Difficulty scores of {length}-letter words are stale, ignored until recomputed")
+            return None
+        return scores
+
+    def set_difficulty(self, scores: dict[int, tuple[str, np.ndarray]]) -> None:
+        """Use freshly computed scores ({length: (fingerprint, scores)}) instead of the file read before."""
+        self._difficulty = scores
+        self._stale_difficulty = set()
+        self._buckets = {}
+
+    def has_difficulty(self) -> bool:
+        """Whether every length has current difficulty scores."""
+        return all(self.difficulty(length) is not None for length in self._main_by_length)
+
+    def difficulty_buckets(self, length: int) -> tuple[np.ndarray, ...] | None:
+        """Indices into words(length) per DIFFICULTY_LEVELS, equal thirds by score."""
+        if length not in self._buckets:
+            scores = self.difficulty(length)
+            buckets = None
+            if scores is not None:
+                buckets = tuple(np.array_split(np.argsort(scores, kind="stable"), len(DIFFICULTY_LEVELS)))
+            self._buckets[length] = buckets
+        return self._buckets[length]
+
+    def random_word(self, length: int, difficulty: str | None = None) -> str | None:
+        """
+        Random main word of the length in O(1), from the difficulty bucket when
+        scores exist for the current list, otherwise (or for "any") from all words.
+        """
+        words = self.words(length)
+        if not words:
+            return None
+        buckets = self.difficulty_buckets(length) if difficulty in DIFFICULTY_LEVELS else None
+        if buckets is not None:
+            bucket = buckets[DIFFICULTY_LEVELS.index(difficulty)]
+            if len(bucket):
+                return words[bucket[random.randrange(len(bucket))]]
+        return random.choice(words)
+
+    def letter_counts(self, length: int) -> np.ndarray:
+        """(n, 32) uint8 letter count vectors of words(length), row i is words(length)[i]."""
+        counts = self._letter_counts.get(length)
+        if counts is None:
+            codes = self.codes(length)
+            counts = np.zeros((len(codes), len(ALPHABET)), dtype=np.uint8)
+            rows = np.arange(len(codes))
+            for pos in range(length):
+                counts[rows, codes[:, pos]] += 1
+            self._letter_counts[length] = counts
+        return counts
+
+    def common_letter_words(self, secret: str, common: int) -> Tuple[str, ...]:
+        """Main words of the secret's length sharing exactly `common` letters with it (multiset)."""
+        key = (secret, common)
+        found = self._hint_cache.get(key)
+        if found is None:
+            length = len(secret)
+            words = self.words(length)
+            shared = np.minimum(self.letter_counts(length), letter_vector(secret)).sum(axis=1)
+            found = tuple(words[i] for i in np.flatnonzero(shared == common) if words[i] != secret)
+            self._hint_cache[key] = found
+        return found
+
+
+def load_dictionary() -> Dictionary:
+    """Load the compiled artifact; compile it first if it is missing or stale."""
+    start = time.perf_counter()
+    groups = read_compiled()
+    if groups is None:
+        logger.warning("Compiled dictionary is missing or stale, compiling base_words.json")
+        groups = compile_dictionary()
+
+    dictionary = Dictionary(*groups)
+    logger.info(f"Dictionary loaded: {len(dictionary)} words in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return dictionary
+
+
+# Current snapshot; replaced as a whole, never mutated
+_current: Dictionary | None = None
+
+
+def get_dictionary() -> Dictionary:
+    global _current
+    if _current is None:
+        _current = load_dictionary()
+    return _current
+
+
+def reload_dictionary() -> Dictionary:
+    """Recompile base_words.json and swap in the new snapshot (readers keep the old one until done)."""
+    global _current
+    _current = Dictionary(*compile_dictionary())
+    return _current
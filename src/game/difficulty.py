@@ -0,0 +1,119 @@
+"""
+Offline step: difficulty score of every possible secret.
+
+    python -m src.game.difficulty [--repeat 50] [--workers N]
+
+A word is hard when the simulated player (random strategy, no hint) needs many
+attempts to find it and when its letters are rare among the words of its length.
+Both are turned into percentiles within the length and mixed with RARITY_WEIGHT.
+Scores go from 0 (easy) to 1 (hard) and are written next to the compiled
+dictionary, keyed by the fingerprint of the list. The bot recomputes the lengths
+whose list changed (update_difficulty) at startup and after /suggestions_approve;
+until then secrets of those lengths are picked from all words.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.main.config import DIFFICULTY_FILE, DIFFICULTY_REPEAT, DIFFICULTY_WORKERS
+from src.main.constants import MAX_ATTEMPTS
+from src.game.compile_dictionary import read_difficulty, write_difficulty
+from src.game.dictionary import Dictionary, get_dictionary
+from src.game.logic import ALPHABET
+from src.game.simulate import simulate
+
+logger = logging.getLogger(__name__)
+
+# Share of letter rarity in the score, the rest is simulated attempts
+RARITY_WEIGHT = 0.3
+
+# One update at a time: startup and reloads may overlap
+_update_lock = threading.Lock()
+
+
+def percentile(values: np.ndarray) -> np.ndarray:
+    """Rank of each value in 0..1, ties get the same (mid) rank."""
+    if len(values) < 2:
+        return np.zeros(len(values))
+    ordered = np.sort(values)
+    low = np.searchsorted(ordered, values, side="left")
+    high = np.searchsorted(ordered, values, side="right") - 1
+    return (low + high) / 2 / (len(values) - 1)
+
+
+def letter_rarity(dictionary: Dictionary, length: int) -> np.ndarray:
+    """Mean surprisal (bits) of the letters of each word among words of its length."""
+    codes = dictionary.codes(length)
+    freq = np.bincount(codes.ravel(), minlength=len(ALPHABET)) / codes.size
+    return (-np.log2(freq[codes])).mean(axis=1)
+
+
+def difficulty_scores(pool, dictionary: Dictionary, length: int, repeat: int, seed: int = 0) -> np.ndarray:
+    n = len(dictionary.words(length))
+    attempts = simulate(pool, length, "random", "none", np.tile(np.arange(n), repeat), seed=seed).astype(float)
+    # a lost game counts as one attempt more than the limit
+    attempts[attempts == 0] = MAX_ATTEMPTS + 1
+    mean_attempts = attempts.reshape(repeat, n).mean(axis=0)
+    score = (1 - RARITY_WEIGHT) * percentile(mean_attempts) + RARITY_WEIGHT * percentile(letter_rarity(dictionary, length))
+    return score.astype(np.float32)
+
+
+def update_difficulty(repeat: int = DIFFICULTY_REPEAT, workers: int = DIFFICULTY_WORKERS,
+                      path: Path = DIFFICULTY_FILE) -> list[int]:
+    """
+    Recompute the scores of the lengths whose word list changed since the file
+    was written, save the file and hand the scores to the current dictionary.
+    Blocking (seconds per length); returns the recomputed lengths.
+    """
+    with _update_lock:
+        dictionary = get_dictionary()
+        saved = read_difficulty(path)
+        scores = {
+            length: saved[length] for length in range(4, 12)
+            if length in saved and saved[length][0] == dictionary.fingerprint(length)
+            and len(saved[length][1]) == len(dictionary.words(length))
+        }
+        stale = [length for length in range(4, 12) if dictionary.words(length) and length not in scores]
+        if stale:
+            start = time.perf_counter()
+            # spawn: the caller may be a thread of the running bot; workers load the compiled dictionary
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                for length in stale:
+                    scores[length] = (dictionary.fingerprint(length), difficulty_scores(pool, dictionary, length, repeat))
+            write_difficulty(scores, path)
+            logger.info(f"Difficulty scores of lengths {stale} computed in {time.perf_counter() - start:.1f} s")
+        dictionary.set_difficulty(scores)
+        return stale
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50, help="simulated games per word")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    dictionary = get_dictionary()
+    scores = {}
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for length in range(4, 12):
+            words = dictionary.words(length)
+            if not words:
+                continue
+            values = difficulty_scores(pool, dictionary, length, args.repeat, args.seed)
+            scores[length] = (dictionary.fingerprint(length), values)
+            order = np.argsort(values)
+            print(f"{length} букв: легко {words[order[0]]}, сложно {words[order[-1]]}")
+    write_difficulty(scores)
+    print(f"-> {DIFFICULTY_FILE} in {time.perf_counter() - start:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
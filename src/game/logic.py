@@ -1,42 +1,54 @@
 import json
-from typing import Dict, List, Tuple
+import logging
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
 from src.main.config import BASE_FILE
 from src.main.constants import GREEN, YELLOW, WHITE
 from src.languages.russian import replace_yo
 
 
+logger = logging.getLogger(__name__)
+
+# Letters after replace_yo, in cp1251 byte order (0xE0..0xFF)
+ALPHABET = "абвгдежзийклмнопрстуфхцчшщъыьэюя"
+_LETTERS = frozenset(ALPHABET)
+
+
 def normalize(text: str) -> str:
     return text.strip().lower()
 
 
-def load_wordlist() -> Tuple[List[str], List[str]]:
-    """Load and filter word lists from base_words.json."""
-    with BASE_FILE.open("r", encoding="utf-8") as f:
+def is_game_word(word: str) -> bool:
+    """4-11 letters of ALPHABET after normalizing: only such words can be encoded (encode_words)."""
+    w = normalize(replace_yo(word))
+    return 4 <= len(w) <= 11 and _LETTERS.issuperset(w)
+
+
+def read_wordlist(path: Path = BASE_FILE) -> Tuple[List[str], List[str]]:
+    """Read base_words.json and return normalized, deduplicated, sorted (main, additional)."""
+    with path.open("r", encoding="utf-8") as f:
         base_words = json.load(f)
         main_words = base_words.get("main", [])
         additional_words = base_words.get("additional", [])
 
-    # Filter and normalize words
-    filtered_main = [normalize(replace_yo(w)) for w in main_words if w.isalpha() and 4 <= len(w) <= 11]
-    filtered_additional = [normalize(replace_yo(w)) for w in additional_words if w.isalpha() and 4 <= len(w) <= 11]
+    # Filter and normalize words; other alphabets would break the letter encoding
+    filtered_main = [normalize(replace_yo(w)) for w in main_words if is_game_word(w)]
+    filtered_additional = [normalize(replace_yo(w)) for w in additional_words if is_game_word(w)]
+    foreign = sorted(w for w in (*main_words, *additional_words)
+                     if w.isalpha() and 4 <= len(w) <= 11 and not is_game_word(w))
+    if foreign:
+        logger.warning(f"Skipped {len(foreign)} words with letters outside the alphabet: {', '.join(foreign[:20])}")
 
-    # Remove duplicates
-    filtered_main = list(dict.fromkeys(filtered_main))
-    filtered_additional = list(dict.fromkeys(filtered_additional))
-
-    # Sort and save
-    main_sorted = sorted(filtered_main)
-    additional_sorted = sorted(filtered_additional)
-    with BASE_FILE.open("w", encoding="utf-8") as f:
-        json.dump({"main": main_sorted, "additional": additional_sorted}, f, ensure_ascii=False, indent=2)
+    # Remove duplicates and sort
+    main_sorted = sorted(dict.fromkeys(filtered_main))
+    additional_sorted = sorted(dict.fromkeys(filtered_additional))
 
     return main_sorted, additional_sorted
 
 
-# Initialize wordlist
-WORDLIST, _ = load_wordlist()
-
-
 def analyze_guess(secret: str, guess: str) -> Tuple[str, Dict[str, str]]:
     """
     Analyze a guess against the secret word.
@@ -74,9 +86,8 @@ def make_feedback(secret: str, guess: str) -> str:
     return analyze_guess(secret, guess)[0]
 
 
-def compute_letter_status(secret: str, guesses: List[str]) -> Dict[str, str]:
-    """Compute the status of each letter based on all guesses."""
-    status: Dict[str, str] = {}
+def update_letter_status(status: Dict[str, str], secret: str, guesses: List[str]) -> Dict[str, str]:
+    """Merge the letter status of more guesses into `status` (in place)."""
     for guess in guesses:
         _, guess_status = analyze_guess(secret, guess)
         # Update status only if new status is better
@@ -87,4 +98,153 @@ def compute_letter_status(secret: str, guesses: List[str]) -> Dict[str, str]:
                 (new_status == "red" and status[letter] not in ("green", "yellow"))
             ):
                 status[letter] = new_status
-    return status
\ No newline at end of file
+    return status
+
+
+def compute_letter_status(secret: str, guesses: List[str]) -> Dict[str, str]:
+    """Compute the status of each letter based on all guesses."""
+    return update_letter_status({}, secret, guesses)
+
+
+# —— Batched feedback ——
+# A word is an array of letter indices in ALPHABET. The feedback of a guess is a
+# pattern code: digit i (base 3) is the colour of position i, 0 white, 1 yellow, 2 green.
+# uint32, since 3**11 does not fit in 16 bits.
+
+PATTERN_DIGITS = {WHITE: 0, YELLOW: 1, GREEN: 2}
+PATTERN_COLORS = (WHITE, YELLOW, GREEN)
+
+
+def encode_words(words: Sequence[str], length: int) -> np.ndarray:
+    """Words of one length as an (n, length) uint8 array of letter indices in ALPHABET."""
+    raw = "".join(words).encode("cp1251")
+    return (np.frombuffer(raw, dtype=np.uint8) - 0xE0).reshape(len(words), length)
+
+
+def encode_word(word: str) -> np.ndarray:
+    return encode_words((word,), len(word))[0]
+
+
+def letter_vector(word: str) -> np.ndarray:
+    """Letter multiset of one word as a count vector over ALPHABET."""
+    return np.bincount(encode_word(word), minlength=len(ALPHABET)).astype(np.uint8)
+
+
+def feedback_codes(guesses: np.ndarray, secrets: np.ndarray) -> np.ndarray:
+    """
+    Pattern codes of guesses against secrets, both (n, L) arrays (or one (L,) row,
+    broadcast against the other). Same colours as analyze_guess, repeated letters included.
+    """
+    guesses, secrets = np.broadcast_arrays(np.atleast_2d(guesses), np.atleast_2d(secrets))
+    n, length = guesses.shape
+    rows = np.arange(n)
+
+    green = guesses == secrets
+    # letters of the secret not matched in place, available for yellows
+    left = np.zeros((n, len(ALPHABET)), dtype=np.int8)
+    for pos in range(length):
+        left[rows, secrets[:, pos]] += ~green[:, pos]
+
+    codes = np.zeros(n, dtype=np.uint32)
+    for pos in range(length):
+        letter = guesses[:, pos]
+        yellow = ~green[:, pos] & (left[rows, letter] > 0)
+        left[rows, letter] -= yellow
+        codes += (2 * green[:, pos] + yellow).astype(np.uint32) * np.uint32(3 ** pos)
+    return codes
+
+
+def guess_vs_secrets(guess: str, secrets: np.ndarray) -> np.ndarray:
+    """Pattern code of one guess against each row of secrets (n, L)."""
+    return feedback_codes(encode_word(guess), secrets)
+
+
+def guesses_vs_secret(guesses: np.ndarray, secret: str) -> np.ndarray:
+    """Pattern code of each row of guesses (n, L) against one secret."""
+    return feedback_codes(guesses, encode_word(secret))
+
+
+def pattern_code(feedback: str) -> int:
+    """Pattern code of a feedback string as returned by make_feedback."""
+    return sum(PATTERN_DIGITS[ch] * 3 ** i for i, ch in enumerate(feedback))
+
+
+def pattern_feedback(code: int, length: int) -> str:
+    """Feedback string (squares) of a pattern code."""
+    out = []
+    for _ in range(length):
+        code, digit = divmod(int(code), 3)
+        out.append(PATTERN_COLORS[digit])
+    return "".join(out)
+
+
+def solved_code(length: int) -> int:
+    """Pattern code of an all-green guess."""
+    return 3 ** length - 1
+
+
+# —— Precomputed pattern tables ——
+
+def pattern_dtype(length: int) -> np.dtype:
+    """Smallest unsigned dtype holding every pattern code of the length."""
+    return np.dtype(np.uint8) if 3 ** length <= 256 else np.dtype(np.uint16)
+
+
+class PatternTable:
+    """
+    Pattern codes of every accepted guess against every possible secret of one
+    length: matrix[i, j] is valid_words(L)[i] against words(L)[j]. The matrix is
+    normally a read-only memory map, shared between processes via the page cache.
+    """
+
+    def __init__(self, matrix: np.ndarray, guesses: Sequence[str], secrets: Sequence[str]):
+        self.matrix = matrix
+        self.length = len(secrets[0]) if secrets else 0
+        self._guess_rows = {w: i for i, w in enumerate(guesses)}
+        self._secret_cols = {w: j for j, w in enumerate(secrets)}
+        # guess row of each secret (secrets are accepted guesses too)
+        self.secret_rows = np.fromiter((self._guess_rows[w] for w in secrets), dtype=np.intp, count=len(secrets))
+
+    @classmethod
+    def load(cls, path: Path, guesses: Sequence[str], secrets: Sequence[str]) -> "PatternTable | None":
+        """Memory-map a table written by src.game.pattern_tables; None if missing or of the wrong shape."""
+        try:
+            matrix = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+        if matrix.shape != (len(guesses), len(secrets)):
+            return None
+        return cls(matrix, guesses, secrets)
+
+    def guess_row(self, guess: str) -> int:
+        return self._guess_rows[guess]
+
+    def secret_col(self, secret: str) -> int:
+        return self._secret_cols[secret]
+
+    def pattern(self, guess: str, secret: str) -> int:
+        """Pattern code of guess against secret, one lookup."""
+        return int(self.matrix[self._guess_rows[guess], self._secret_cols[secret]])
+
+    def codes(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """(len(rows), len(cols)) pattern codes of guess rows against secret columns."""
+        return self.matrix[np.ix_(rows, cols)]
+
+    def partition_sizes(self, guess: str, candidates: np.ndarray) -> np.ndarray:
+        """Number of candidates (secret columns) giving each pattern code of guess."""
+        row = self.matrix[self._guess_rows[guess], candidates]
+        return np.bincount(row, minlength=3 ** self.length)
+
+    def partition(self, guess: str, candidates: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Candidates (secret columns) grouped by the pattern guess gives:
+        returns (ordered, codes, bounds), group i has pattern codes[i] and is
+        ordered[bounds[i]:bounds[i + 1]].
+        """
+        row = self.matrix[self._guess_rows[guess], candidates]
+        # stable sort of 8/16-bit integers is a radix sort: O(k)
+        order = np.argsort(row, kind="stable")
+        sizes = np.bincount(row, minlength=3 ** self.length)
+        codes = np.flatnonzero(sizes)
+        bounds = np.concatenate(([0], np.cumsum(sizes[codes])))
+        return np.asarray(candidates)[order], codes, bounds
@@ -0,0 +1,57 @@
+"""
+Offline step: precompute the guess x secret pattern tables of short words.
+
+    python -m src.game.pattern_tables [lengths...]
+
+For each length (PATTERN_TABLE_LENGTHS by default) writes a .npy matrix of
+pattern codes, rows valid_words(L), columns words(L), into DATA_DIR. The file
+name carries the fingerprint of both lists, so a table built for another
+dictionary is never loaded; tables of older lists are removed. uint8 holds the
+3**5 codes of 5 letters, 6 letters need uint16.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.main.config import DATA_DIR, PATTERN_TABLE_FILE, PATTERN_TABLE_LENGTHS
+from src.game.dictionary import Dictionary, get_dictionary
+from src.game.logic import feedback_codes, pattern_dtype
+
+# guesses encoded per feedback_codes() call
+CHUNK_ROWS = 256
+
+
+def build_table(dictionary: Dictionary, length: int):
+    """Write the table of one length, return its path."""
+    guesses = dictionary.valid_codes(length)
+    secrets = dictionary.codes(length)
+    path = dictionary.pattern_table_path(length)
+    tmp = path.with_name(path.name + ".tmp")
+
+    matrix = np.lib.format.open_memmap(tmp, mode="w+", dtype=pattern_dtype(length),
+                                       shape=(len(guesses), len(secrets)))
+    for start in range(0, len(guesses), CHUNK_ROWS):
+        chunk = guesses[start:start + CHUNK_ROWS]
+        codes = feedback_codes(np.repeat(chunk, len(secrets), axis=0), np.tile(secrets, (len(chunk), 1)))
+        matrix[start:start + len(chunk)] = codes.reshape(len(chunk), len(secrets))
+    matrix.flush()
+    del matrix
+    os.replace(tmp, path)
+
+    # tables of previous word lists
+    for old in DATA_DIR.glob(PATTERN_TABLE_FILE.format(length=length, fingerprint="*")):
+        if old != path:
+            old.unlink()
+    return path
+
+
+if __name__ == "__main__":
+    lengths = [int(arg) for arg in sys.argv[1:]] or PATTERN_TABLE_LENGTHS
+    dictionary = get_dictionary()
+    for length in lengths:
+        start = time.perf_counter()
+        path = build_table(dictionary, length)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{length} букв: -> {path.name} ({path.stat().st_size} bytes) in {elapsed:.0f} ms")
@@ -1,23 +1,164 @@
+import asyncio
+import multiprocessing
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 
-from src.game.logic import make_feedback, compute_letter_status
+from src.game.logic import make_feedback, compute_letter_status, update_letter_status
 from src.main.constants import GREEN, YELLOW, WHITE
 from src.languages.russian import KB_LAYOUT, SPECIAL_RUSSIAN_LETTERS
-from src.main.config import FONT_FILE
+from src.main.config import (FONT_FILE, RENDER_EXECUTOR, RENDER_WORKERS,
+                             RENDER_MAX_PENDING, RENDER_STATE_CACHE, RENDER_MODE,
+                             RENDER_FORMAT, RENDER_COMPRESS_LEVEL,
+                             RENDER_PALETTE_COLORS, RENDER_WEBP_QUALITY)
 
+# Render pool, created on first use
+_executor: Executor | None = None
+_pending: asyncio.Semaphore | None = None
 
-def render_full_board_with_keyboard(
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if RENDER_EXECUTOR == "process":
+            # spawn: forking a process with running threads is not safe
+            _executor = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            # Pillow releases the GIL while resampling and encoding
+            _executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+    return _executor
+
+
+def _render_png(guesses: list[str], secret: str, total_rows: int, max_width_px: int, state_key,
+                evictions: tuple = ()) -> bytes:
+    _apply_evictions(evictions)
+    return render_full_board_with_keyboard(guesses, secret, total_rows, max_width_px, state_key).getvalue()
+
+
+async def render_board(
     guesses: list[str],
     secret: str,
     total_rows: int = 6,
-    max_width_px: int = 1080
+    max_width_px: int = 1080,
+    state_key=None
 ) -> BytesIO:
-    # antialiasing: render at 3x size, then reduce
-    scale = 3
+    """
+    Render the board in the render pool without blocking the event loop.
+    At most RENDER_MAX_PENDING renders are queued or running, further callers wait.
+    """
+    global _pending
+    if _pending is None:
+        _pending = asyncio.Semaphore(RENDER_MAX_PENDING)
+
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            _get_executor(), _render_png, list(guesses), secret, total_rows, max_width_px, state_key,
+            tuple(_evictions) if RENDER_EXECUTOR == "process" else ()
+        )
+    return BytesIO(data)
+
+
+async def shutdown_render_pool(app) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+BACKGROUND = (24, 24, 32)
+OUTLINE    = (40, 40, 50)
+TEXT_COLOR = (255, 255, 255)
+
+# Board cell color by feedback mark (None = empty row)
+BOARD_COLORS = {
+    GREEN:  (121, 184, 81),   # #79b851
+    YELLOW: (243, 194, 55),   # #f3c237
+    WHITE:  (72, 73, 84),     # #484954
+    None:   (211, 214, 218),  # #d3d6da
+}
+
+# Keyboard key color by letter status (None = not used yet)
+KEY_COLORS = {
+    "green":  (121, 184, 81),   # #79b851
+    "yellow": (243, 194, 55),   # #f3c237
+    "red":    (72, 73, 84),     # #484954
+    None:     (129, 130, 155),  # #81829b
+}
+
+
+@lru_cache(maxsize=None)
+def _font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(FONT_FILE, size)
+
+
+@lru_cache(maxsize=1024)
+def _tile(letter: str | None, bg: tuple, sq: int, outline_width: int) -> Image.Image:
+    """One cell or key: square of side sq (+1px edge, as in draw.rectangle) with a centered letter."""
+    tile = Image.new("RGB", (sq + 1, sq + 1), BACKGROUND)
+    draw = ImageDraw.Draw(tile)
+    draw.rectangle([0, 0, sq, sq], fill=bg, outline=OUTLINE, width=outline_width)
+
+    if letter:
+        font = _font(int(sq * 0.6))
+        ch   = letter.upper()
+        bbox = draw.textbbox((0, 0), ch, font=font)
+        w, h = bbox[2]-bbox[0], bbox[3]-bbox[1]
+        if letter in SPECIAL_RUSSIAN_LETTERS:
+            y_offset = -sq * 0.05  # special letters slightly higher (5%)
+        else:
+            y_offset = -sq * 0.10  # other letters higher (10%)
+        draw.text(((sq-w)/2, (sq-h)/2 + y_offset), ch, font=font, fill=TEXT_COLOR)
+
+    return tile
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """Geometry of the drawn image for one word length (3x when supersampling)."""
+    scale:    int
+    padding:  int
+    board_outline: int
+    kb_outline:    int
+    cols:     int
+    rows:     int
+    board_sq: int
+    kb_sq:    int
+    board_w:  int
+    board_h:  int
+    img_h:    int
+
+    def cell_xy(self, r: int, c: int) -> tuple[int, int]:
+        return (self.padding + c * (self.board_sq + self.padding),
+                self.padding + r * (self.board_sq + self.padding))
+
+    def key_xy(self, ri: int, i: int) -> tuple[int, int]:
+        row_len = len(KB_LAYOUT[ri])
+        row_pad = (row_len + 1) * self.padding
+        row_w   = row_len * self.kb_sq + row_pad
+        x_off   = (self.board_w - row_w) // 2
+        return (x_off + self.padding + i * (self.kb_sq + self.padding),
+                self.board_h + self.padding + ri * (self.kb_sq + self.padding))
+
+    @property
+    def out_size(self) -> tuple[int, int]:
+        return self.board_w // self.scale, self.img_h // self.scale
+
+
+@lru_cache(maxsize=None)
+def _layout(cols: int, total_rows: int, max_width_px: int, mode: str = RENDER_MODE) -> _Layout:
+    # supersample: antialiasing by rendering at 3x size, then reduce
+    # direct: draw at target size, only the text is antialiased (by FreeType)
+    scale = 3 if mode == "supersample" else 1
     padding   = 6 * scale
     board_def = 80 * scale
-    cols      = len(secret)
     total_pad = (cols + 1) * padding
 
     # board square size
@@ -36,100 +177,238 @@ def render_full_board_with_keyboard(
         factor = 0.4
     elif cols == 5:
         factor = 0.3
-    elif cols == 4:
+    else:
         factor = 0.25
 
     kb_sq   = max(12 * scale, int(board_sq * factor))
     kb_rows = len(KB_LAYOUT)
     img_h   = board_h + kb_rows * kb_sq + (kb_rows + 1) * padding
 
-    img        = Image.new("RGB", (board_w, img_h), (24, 24, 32))
-    draw       = ImageDraw.Draw(img)
-    font_board = ImageFont.truetype(FONT_FILE, int(board_sq * 0.6))
-    font_kb    = ImageFont.truetype(FONT_FILE, int(kb_sq * 0.6))
+    # outlines of 2 and 1 px at 3x, at least 1 px at target size
+    board_outline = max(1, 2 * scale // 3)
+    kb_outline    = max(1, scale // 3)
 
-    # game board (6 rows)
-    for r in range(total_rows):
-        y0 = padding + r * (board_sq + padding)
-        if r < len(guesses):
-            guess = guesses[r]
-            fb    = make_feedback(secret, guess)
-        else:
-            guess = None
-            fb    = [None] * cols
-
-        for c in range(cols):
-            x0 = padding + c * (board_sq + padding)
-            x1 = x0 + board_sq
-            y1 = y0 + board_sq
-
-            color = fb[c]
-            if color == GREEN:
-                bg = (121,184,81)  # #79b851
-            elif color == YELLOW:
-                bg = (243,194,55)  # #f3c237
-            elif color == WHITE:
-                bg = (72,73,84)  # #484954
-            else:
-                bg = (211,214,218)  # #d3d6da
+    return _Layout(scale, padding, board_outline, kb_outline, cols, total_rows,
+                   board_sq, kb_sq, board_w, board_h, img_h)
+
+
+# Extra pixels pasted around a supersampled region, wider than the LANCZOS support (3 * scale)
+_MARGIN = 12
 
-            draw.rectangle([x0,y0,x1,y1], fill=bg, outline=(40,40,50), width=2)
 
+def _compose(
+    layout: _Layout,
+    guesses: list[str],
+    feedbacks: list[str],
+    letter_status: dict[str, str],
+    box: tuple[int, int, int, int]
+) -> Image.Image:
+    """
+    Paste the tiles covering `box` (layout coordinates) and downscale that region.
+    The canvas includes a margin around the box, so the result matches the same
+    region of a full-image downscale.
+    """
+    s = layout.scale
+    x0, y0, x1, y1 = box
+    # direct mode has nothing to resample, so no margin
+    margin = _MARGIN if s > 1 else 0
+    cx0, cy0 = max(x0 - margin, 0), max(y0 - margin, 0)
+    cx1, cy1 = min(x1 + margin, layout.board_w), min(y1 + margin, layout.img_h)
+    canvas = Image.new("RGB", (cx1 - cx0, cy1 - cy0), BACKGROUND)
+
+    def place(x, y, sq, tile_args):
+        if x < cx1 and x + sq + 1 > cx0 and y < cy1 and y + sq + 1 > cy0:
+            canvas.paste(_tile(*tile_args), (x - cx0, y - cy0))
+
+    # game board (6 rows)
+    for r in range(layout.rows):
+        guess = guesses[r] if r < len(guesses) else None
+        for c in range(layout.cols):
+            x, y = layout.cell_xy(r, c)
             if guess:
-                ch = guess[c].upper()
-                tc = (255,255,255)
-                bbox = draw.textbbox((0,0), ch, font=font_board)
-                w, h = bbox[2]-bbox[0], bbox[3]-bbox[1]
-                if ch.lower() in SPECIAL_RUSSIAN_LETTERS:
-                    y_offset = -board_sq * 0.05  # special letters slightly higher (5%)
-                else:
-                    y_offset = -board_sq * 0.10  # other letters higher (10%)
-                draw.text(
-                    (x0 + (board_sq-w)/2, y0 + (board_sq-h)/2 + y_offset),
-                    ch, font=font_board, fill=tc
-                )
+                place(x, y, layout.board_sq, (guess[c], BOARD_COLORS[feedbacks[r][c]], layout.board_sq, layout.board_outline))
+            else:
+                place(x, y, layout.board_sq, (None, BOARD_COLORS[None], layout.board_sq, layout.board_outline))
 
     # mini-keyboard
-    letter_status = compute_letter_status(secret, guesses)
     for ri, row in enumerate(KB_LAYOUT):
-        y0      = board_h + padding + ri * (kb_sq + padding)
-        row_len = len(row)
-        row_pad = (row_len + 1) * padding
-        row_w   = row_len * kb_sq + row_pad
-        x_off   = (board_w - row_w) // 2
-
         for i, ch in enumerate(row):
-            x0 = x_off + padding + i * (kb_sq + padding)
-            x1 = x0 + kb_sq
-            y1 = y0 + kb_sq
-
-            st = letter_status.get(ch)
-            if st == "green":
-                bg = (121,184,81)  # #79b851
-            elif st == "yellow":
-                bg = (243,194,55)  # #f3c237
-            elif st == "red":
-                bg = (72,73,84)  # #484954
-            else:
-                bg = (129,130,155)  # #81829b
-
-            draw.rectangle([x0,y0,x1,y1], fill=bg, outline=(40,40,50), width=1)
-            tc = (255,255,255)
-            letter = ch.upper()
-            bbox   = draw.textbbox((0,0), letter, font=font_kb)
-            w, h   = bbox[2]-bbox[0], bbox[3]-bbox[1]
-            if ch in SPECIAL_RUSSIAN_LETTERS:
-                y_offset = -kb_sq * 0.05  # special letters slightly higher (5%)
-            else:
-                y_offset = -kb_sq * 0.10  # other letters higher (10%)
-            draw.text(
-                (x0 + (kb_sq-w)/2, y0 + (kb_sq-h)/2 + y_offset),
-                letter, font=font_kb, fill=tc
-            )
+            x, y = layout.key_xy(ri, i)
+            place(x, y, layout.kb_sq, (ch, KEY_COLORS[letter_status.get(ch)], layout.kb_sq, layout.kb_outline))
+
+    if s == 1:
+        return canvas
 
     # resize to normal size with antialiasing
-    final_img = img.resize((board_w // scale, img_h // scale), Image.LANCZOS)
-    final_buf = BytesIO()
-    final_img.save(final_buf, format="PNG")
-    final_buf.seek(0)
-    return final_buf
\ No newline at end of file
+    size = ((x1 - x0) // s, (y1 - y0) // s) if box != (0, 0, layout.board_w, layout.img_h) else layout.out_size
+    return canvas.resize(size, Image.LANCZOS, box=(x0 - cx0, y0 - cy0, x1 - cx0, y1 - cy0))
+
+
+@dataclass
+class _RenderState:
+    """Last rendered board of one game: the final image and what is drawn on it."""
+    secret:        str
+    layout:        _Layout
+    guesses:       list[str]
+    feedbacks:     list[str]
+    letter_status: dict[str, str]
+    image:         Image.Image
+
+
+# Render state per game (key chosen by the caller), least recently used first
+_states: OrderedDict = OrderedDict()
+_states_lock = threading.Lock()
+
+# Process pool: every worker keeps its own states. Evictions are numbered and the
+# recent ones go with each render, a worker drops those it has not applied yet.
+_evictions: deque = deque(maxlen=RENDER_STATE_CACHE)
+_eviction_seq = 0
+_applied_seq = 0   # in a worker: last eviction applied
+
+
+def evict_render_state(key) -> None:
+    """Forget the cached board of a finished or reset game."""
+    global _eviction_seq
+    with _states_lock:
+        _states.pop(key, None)
+        if RENDER_EXECUTOR == "process":
+            _eviction_seq += 1
+            _evictions.append((_eviction_seq, key))
+
+
+def _apply_evictions(evictions: tuple) -> None:
+    global _applied_seq
+    with _states_lock:
+        for seq, key in evictions:
+            if seq > _applied_seq:
+                _states.pop(key, None)
+                _applied_seq = seq
+
+
+def _get_state(key) -> _RenderState | None:
+    with _states_lock:
+        state = _states.get(key)
+        if state is not None:
+            _states.move_to_end(key)
+        return state
+
+
+def _put_state(key, state: _RenderState) -> None:
+    with _states_lock:
+        _states[key] = state
+        _states.move_to_end(key)
+        while len(_states) > RENDER_STATE_CACHE:
+            _states.popitem(last=False)
+
+
+def _aligned(v0: int, v1: int, scale: int) -> tuple[int, int]:
+    return v0 - v0 % scale, v1 + (-v1) % scale
+
+
+def _full_render(secret: str, layout: _Layout, guesses: list[str]) -> _RenderState:
+    feedbacks = [make_feedback(secret, g) for g in guesses]
+    letter_status = compute_letter_status(secret, guesses)
+    image = _compose(layout, guesses, feedbacks, letter_status, (0, 0, layout.board_w, layout.img_h))
+    return _RenderState(secret, layout, list(guesses), feedbacks, letter_status, image)
+
+
+def _advance(state: _RenderState, guesses: list[str]) -> None:
+    """Draw only the new rows and the keyboard keys whose status changed."""
+    layout, s = state.layout, state.layout.scale
+    new = guesses[len(state.guesses):]
+    old_status = dict(state.letter_status)
+
+    first = len(state.guesses)
+    state.guesses.extend(new)
+    state.feedbacks.extend(make_feedback(state.secret, g) for g in new)
+    update_letter_status(state.letter_status, state.secret, new)
+
+    # boxes to redraw: changed tiles plus the LANCZOS reach around them,
+    # aligned to the scale so they downscale onto whole pixels
+    reach = 3 * s if s > 1 else 0
+    boxes = []
+    for r in range(first, min(len(state.guesses), layout.rows)):
+        _, y = layout.cell_xy(r, 0)
+        y0, y1 = _aligned(y - reach, y + layout.board_sq + 1 + reach, s)
+        boxes.append((0, y0, layout.board_w, y1))
+    for ri, row in enumerate(KB_LAYOUT):
+        for i, ch in enumerate(row):
+            if state.letter_status.get(ch) != old_status.get(ch):
+                x, y = layout.key_xy(ri, i)
+                x0, x1 = _aligned(x - reach, x + layout.kb_sq + 1 + reach, s)
+                y0, y1 = _aligned(y - reach, y + layout.kb_sq + 1 + reach, s)
+                boxes.append((max(x0, 0), y0, min(x1, layout.board_w), min(y1, layout.img_h)))
+
+    for box in boxes:
+        part = _compose(layout, state.guesses, state.feedbacks, state.letter_status, box)
+        state.image.paste(part, (box[0] // s, box[1] // s))
+
+
+def render_board_image(
+    guesses: list[str],
+    secret: str,
+    total_rows: int = 6,
+    max_width_px: int = 1080
+) -> Image.Image:
+    """Full render of the board as a PIL image, without encoding or render state."""
+    return _full_render(secret, _layout(len(secret), total_rows, max_width_px), guesses).image
+
+
+def render_full_board_with_keyboard(
+    guesses: list[str],
+    secret: str,
+    total_rows: int = 6,
+    max_width_px: int = 1080,
+    state_key=None
+) -> BytesIO:
+    """
+    Render the board with 6 rows and the mini-keyboard as PNG.
+    With state_key, the previous board of that game is reused: only new rows
+    and changed keys are drawn.
+    """
+    layout = _layout(len(secret), total_rows, max_width_px)
+    state = _get_state(state_key) if state_key is not None else None
+
+    # incremental only on an exact grid, where region downscale matches the full one
+    exact = layout.board_w % layout.scale == 0 and layout.img_h % layout.scale == 0
+    if (
+        state is not None and exact
+        and state.secret == secret and state.layout == layout
+        and guesses[:len(state.guesses)] == state.guesses
+    ):
+        _advance(state, guesses)
+    else:
+        state = _full_render(secret, layout, guesses)
+
+    if state_key is not None:
+        _put_state(state_key, state)
+
+    final_buf = BytesIO(encode_board(state.image))
+    return final_buf
+
+
+def encode_board(
+    img: Image.Image,
+    fmt: str = RENDER_FORMAT,
+    compress_level: int = RENDER_COMPRESS_LEVEL,
+    palette_colors: int = RENDER_PALETTE_COLORS,
+    webp_quality: int = RENDER_WEBP_QUALITY
+) -> bytes:
+    """
+    Encode the final board image.
+    png_palette: the board has a handful of colors plus antialiasing, so a small
+    palette is visually the same and much cheaper to compress.
+    """
+    buf = BytesIO()
+    if fmt == "webp":
+        img.save(buf, format="WEBP", quality=webp_quality)
+    elif fmt == "png_palette":
+        pal = img.quantize(colors=palette_colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        pal.save(buf, format="PNG", compress_level=compress_level)
+    else:
+        img.save(buf, format="PNG", compress_level=compress_level)
+    return buf.getvalue()
+
+
+def board_filename() -> str:
+    return "wordle_board.webp" if RENDER_FORMAT == "webp" else "wordle_board.png"
@@ -0,0 +1,247 @@
+"""
+Offline game simulator: plays every secret of the dictionary with a solver
+strategy and a hint policy and reports how often and how fast it is solved.
+
+    python -m src.game.simulate [--lengths 4 5 ...] [--strategies random entropy]
+                                [--hints none letters smart] [--repeat 1] [--workers N]
+
+Strategies (how the simulated player picks a guess):
+    random   a random word still consistent with the feedback (a careful human)
+    entropy  the consistent word with the most informative feedback
+
+Hint policies (the hint is asked for after --hint-after attempts; like /hint,
+it costs no attempt and adds no row to the board):
+    none       no hint
+    letters    a main word sharing HINT_LETTERS[length] letters with the secret, as /hint does:
+               the candidates narrow to words sharing as many letters with it
+    letters:N  the same with N letters for every length
+    smart      the most informative accepted word, as HINT_MODE=smart does:
+               the player plays it as the next guess
+
+Games run in a multiprocessing pool; the pattern tables of short words are
+memory-mapped, so the workers share one copy of them.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import zlib
+
+import numpy as np
+
+from src.main.constants import HINT_LETTERS, MAX_ATTEMPTS
+from src.game.dictionary import get_dictionary
+from src.game.logic import feedback_codes, letter_vector, pattern_dtype
+from src.game.solver import best_guess, codes_entropy, pattern_entropy
+
+# secrets per pool task
+CHUNK_GAMES = 256
+
+
+class Simulator:
+    """
+    Word arrays of one length. Guesses are rows of valid_words(length),
+    secrets and candidates are columns of words(length).
+    """
+
+    def __init__(self, dictionary, length: int):
+        self.dictionary = dictionary
+        self.length = length
+        self.words = dictionary.words(length)
+        self.valid = dictionary.valid_words(length)
+        self.codes = dictionary.codes(length)
+        self.valid_codes = dictionary.valid_codes(length)
+        self.table = dictionary.pattern_table(length)
+        self.secret_rows = np.searchsorted(np.array(self.valid), np.array(self.words))
+        self._rows = {w: i for i, w in enumerate(self.valid)}
+        # without a table: codes of the guesses played so far against every secret
+        self._row_codes: dict[int, np.ndarray] = {}
+        self._opener = None
+
+    def row(self, word: str) -> int:
+        return self._rows[word]
+
+    def feedback(self, row: int, cols: np.ndarray) -> np.ndarray:
+        """Pattern codes of one guess row against secret columns."""
+        if self.table is not None:
+            return self.table.matrix[row, cols]
+        codes = self._row_codes.get(row)
+        if codes is None:
+            codes = self._row_codes[row] = feedback_codes(self.valid_codes[row], self.codes).astype(pattern_dtype(self.length))
+        return codes[cols]
+
+    def entropies(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        if self.table is not None:
+            return codes_entropy(self.table.codes(rows, cols), self.length)
+        return pattern_entropy(self.valid_codes[rows], self.codes[cols])
+
+    def most_informative(self, rows: np.ndarray, cols: np.ndarray) -> tuple[int, float]:
+        """Guess row with the highest entropy over cols, and that entropy."""
+        def score(start, stop):
+            return self.entropies(rows[start:stop], cols)
+
+        i, h = best_guess(score, len(rows), len(cols), float("inf"))
+        return int(rows[i]), h
+
+    def opener(self) -> int:
+        """Most informative first guess (the same for every game)."""
+        if self._opener is None:
+            self._opener = self.most_informative(np.arange(len(self.valid)), np.arange(len(self.words)))[0]
+        return self._opener
+
+
+# —— Strategies: (sim, remaining, turn, rng) -> guess row ——
+
+def random_strategy(sim: Simulator, remaining: np.ndarray, turn: int, rng) -> int:
+    return int(sim.secret_rows[remaining[rng.integers(len(remaining))]])
+
+
+def entropy_strategy(sim: Simulator, remaining: np.ndarray, turn: int, rng) -> int:
+    if turn == 0:
+        return sim.opener()
+    if len(remaining) <= 2:
+        return int(sim.secret_rows[remaining[0]])
+    return sim.most_informative(sim.secret_rows[remaining], remaining)[0]
+
+
+STRATEGIES = {
+    "random":  random_strategy,
+    "entropy": entropy_strategy,
+}
+
+
+# —— Hint policies: (sim, secret, remaining, guessed, rng) -> (remaining, guess row or None) ——
+# A hint may narrow the candidates for free and/or suggest the next guess.
+
+def no_hint(sim, secret, remaining, guessed, rng):
+    return remaining, None
+
+
+def letters_hint(counts: dict[int, int]):
+    def hint(sim, secret, remaining, guessed, rng):
+        shared = counts.get(sim.length, 1)
+        words = sim.dictionary.common_letter_words(secret, shared)
+        if not words:
+            return remaining, None
+        # the player knows the hint shares exactly `shared` letters with the secret
+        word = words[rng.integers(len(words))]
+        common = np.minimum(sim.dictionary.letter_counts(sim.length)[remaining], letter_vector(word)).sum(axis=1)
+        return remaining[common == shared], None
+    return hint
+
+
+def smart_hint(sim, secret, remaining, guessed, rng):
+    if len(remaining) <= 1:
+        return remaining, None
+    pool = np.ones(len(sim.valid), dtype=bool)
+    pool[list(guessed)] = False
+    pool[sim.row(secret)] = False
+    row, h = sim.most_informative(np.flatnonzero(pool), remaining)
+    return remaining, (row if h > 0 else None)
+
+
+def hint_policy(name: str):
+    if name == "none":
+        return no_hint
+    if name == "smart":
+        return smart_hint
+    if name == "letters":
+        return letters_hint(HINT_LETTERS)
+    if name.startswith("letters:"):
+        n = int(name.split(":", 1)[1])
+        return letters_hint({length: n for length in HINT_LETTERS})
+    raise ValueError(f"unknown hint policy: {name}")
+
+
+def play_game(sim: Simulator, secret_col: int, strategy, hint, hint_after: int,
+              max_attempts: int, rng) -> int:
+    """Attempts needed to find the secret, 0 if it was not found in max_attempts."""
+    secret = sim.words[secret_col]
+    secret_row = sim.secret_rows[secret_col]
+    remaining = np.arange(len(sim.words))
+    guessed = set()
+    for turn in range(max_attempts):
+        row = None
+        if turn == hint_after:
+            remaining, row = hint(sim, secret, remaining, guessed, rng)
+        if row is None:
+            row = strategy(sim, remaining, turn, rng)
+        if row == secret_row:
+            return turn + 1
+        guessed.add(row)
+        codes = sim.feedback(row, remaining)
+        # the secret is always among the remaining candidates
+        code = codes[np.searchsorted(remaining, secret_col)]
+        remaining = remaining[codes == code]
+    return 0
+
+
+# One simulator per length and process
+_simulators: dict[int, Simulator] = {}
+
+
+def _simulator(length: int) -> Simulator:
+    sim = _simulators.get(length)
+    if sim is None:
+        sim = _simulators[length] = Simulator(get_dictionary(), length)
+    return sim
+
+
+def _play_chunk(task) -> np.ndarray:
+    length, strategy, policy, secrets, hint_after, max_attempts, seed = task
+    sim = _simulator(length)
+    rng = np.random.default_rng(seed)
+    play, hint = STRATEGIES[strategy], hint_policy(policy)
+    return np.fromiter(
+        (play_game(sim, int(col), play, hint, hint_after, max_attempts, rng) for col in secrets),
+        dtype=np.uint8, count=len(secrets)
+    )
+
+
+def simulate(pool, length: int, strategy: str, policy: str, secrets: np.ndarray,
+             hint_after: int = 2, max_attempts: int = MAX_ATTEMPTS, seed: int = 0) -> np.ndarray:
+    """Attempts (0 = not solved) of one game per entry of secrets (columns of words(length))."""
+    tasks = [
+        (length, strategy, policy, secrets[start:start + CHUNK_GAMES], hint_after, max_attempts,
+         (seed, length, start, zlib.crc32(f"{strategy}/{policy}".encode())))
+        for start in range(0, len(secrets), CHUNK_GAMES)
+    ]
+    return np.concatenate(pool.map(_play_chunk, tasks)) if tasks else np.zeros(0, dtype=np.uint8)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(range(4, 12)))
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--hints", nargs="+", default=["none", "letters", "smart"])
+    parser.add_argument("--repeat", type=int, default=1, help="games per secret")
+    parser.add_argument("--hint-after", type=int, default=2, help="attempts before the hint is used")
+    parser.add_argument("--attempts", type=int, default=MAX_ATTEMPTS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for policy in args.hints:
+        hint_policy(policy)
+
+    dictionary = get_dictionary()
+    print(f"{'len':>3} {'strategy':<9}{'hint':<11}{'games':>9}{'solved':>8}{'mean':>6}"
+          + "".join(f"{n:>7}" for n in range(1, args.attempts + 1)) + f"{'sec':>7}")
+
+    with multiprocessing.Pool(args.workers) as pool:
+        for length in args.lengths:
+            secrets = np.tile(np.arange(len(dictionary.words(length))), args.repeat)
+            for strategy in args.strategies:
+                for policy in args.hints:
+                    start = time.perf_counter()
+                    attempts = simulate(pool, length, strategy, policy, secrets,
+                                        args.hint_after, args.attempts, args.seed)
+                    elapsed = time.perf_counter() - start
+                    dist = np.bincount(attempts, minlength=args.attempts + 1) / max(1, len(attempts))
+                    solved = attempts[attempts > 0]
+                    mean = solved.mean() if len(solved) else 0.0
+                    print(f"{length:>3} {strategy:<9}{policy:<11}{len(attempts):>9}{1 - dist[0]:>8.1%}{mean:>6.2f}"
+                          + "".join(f"{p:>7.1%}" for p in dist[1:]) + f"{elapsed:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Guess selection by expected information: the entropy of the feedback
+pattern distribution a guess produces over the remaining candidates.
+"""
+import time
+
+import numpy as np
+
+from src.game.logic import feedback_codes
+from src.game.candidates import candidate_indices
+
+# guess x candidate pairs scored per NumPy call
+CHUNK_PAIRS = 1 << 15
+
+
+def codes_entropy(codes: np.ndarray, length: int) -> np.ndarray:
+    """Entropy in bits of each row of pattern codes (m, k)."""
+    m, k = codes.shape
+    # one key per (guess, pattern), group sizes with a single unique()
+    keys = np.repeat(np.arange(m, dtype=np.uint64), k) * np.uint64(3 ** length) + codes.ravel()
+    uniq, sizes = np.unique(keys, return_counts=True)
+    rows = (uniq // np.uint64(3 ** length)).astype(np.intp)
+    sum_nlogn = np.bincount(rows, weights=sizes * np.log2(sizes), minlength=m)
+    return np.log2(k) - sum_nlogn / k
+
+
+def pattern_entropy(guesses: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    Entropy in bits of the pattern distribution of each guess (m, L) over candidates (k, L).
+    A guess that splits the candidates into many small groups scores high.
+    """
+    m, length = guesses.shape
+    k = len(candidates)
+    codes = feedback_codes(np.repeat(guesses, k, axis=0), np.tile(candidates, (m, 1)))
+    return codes_entropy(codes.reshape(m, k), length)
+
+
+def best_guess(score, pool_size: int, k: int, budget_s: float) -> tuple[int, float] | None:
+    """
+    Pool index with the highest entropy over k candidates, and that entropy.
+    score(start, stop) returns the entropies of pool[start:stop]. The pool is
+    scored in order, chunk by chunk, while the next chunk fits in the time
+    budget (at least one chunk is scored). None if the pool is empty.
+    """
+    if pool_size == 0 or k == 0:
+        return None
+    deadline = time.perf_counter() + budget_s
+    step = max(1, CHUNK_PAIRS // k)
+    best_row, best_h = -1, -1.0
+    for start in range(0, pool_size, step):
+        started = time.perf_counter()
+        h = score(start, start + step)
+        i = int(np.argmax(h))
+        if h[i] > best_h:
+            best_row, best_h = start + i, float(h[i])
+        # stop if another chunk like this one would not fit
+        now = time.perf_counter()
+        if now + (now - started) > deadline:
+            break
+    return best_row, best_h
+
+
+def smart_hint(game: dict, dictionary, budget_s: float, rng: np.random.Generator | None = None) -> str | None:
+    """
+    Most informative word for the game's remaining candidates: candidates first,
+    then the other accepted words in random order, as far as the budget allows.
+    Never the secret or a word already guessed. None when there is nothing left to
+    learn (one candidate) or no word splits the candidates.
+    """
+    rng = rng or np.random.default_rng()
+    secret = game["secret"]
+    length = len(secret)
+    remaining = candidate_indices(game, dictionary)
+    if len(remaining) <= 1:
+        return None
+
+    words = dictionary.words(length)
+    valid = dictionary.valid_words(length)
+    table = dictionary.pattern_table(length)
+    order = rng.permutation(len(valid))
+    pool_words = [words[i] for i in remaining] + [valid[i] for i in order]
+
+    skip = set(game["guesses"]) | {secret}
+    keep = np.flatnonzero(np.fromiter((w not in skip for w in pool_words), dtype=bool, count=len(pool_words)))
+
+    if table is not None:
+        # guess rows of the pool, codes looked up instead of computed
+        rows = np.concatenate([table.secret_rows[remaining], order])[keep]
+
+        def score(start, stop):
+            return codes_entropy(table.codes(rows[start:stop], remaining), length)
+    else:
+        pool = np.concatenate([dictionary.codes(length)[remaining], dictionary.valid_codes(length)[order]])[keep]
+        candidates = dictionary.codes(length)[remaining]
+
+        def score(start, stop):
+            return pattern_entropy(pool[start:stop], candidates)
+
+    found = best_guess(score, len(keep), len(remaining), budget_s)
+    if found is None or found[1] <= 0:
+        return None
+    return pool_words[keep[found[0]]]
@@ -30,7 +30,7 @@ MSG_UNKNOWN = (
     )
 
 # start.py
-START_MESSENGE = ("Привет! Я Wordle Bot — угадай слово за 6 попыток.\n"
+START_MESSENGE = ("Привет! Я Wordle Bot — угадай слово за {max_attempts} {attempts_word}.\n"
         "https://github.com/sqwirex/wordle-bot - ссылка на репозиторий с кодом бота\n\n"
         "/play — начать или продолжить игру\n"
         "/hint — дает слово в подсказку, если вы затрудняетесь ответить " \
@@ -59,7 +59,7 @@ NOT_FIND_WORDS = "Не нашел слов такой длины. Попробу
 
 NEED_FIX_LETTERS = "Нужно число от 4 до 11."
 
-MSG_GAME_START = "Я загадал слово из {length} букв. У тебя 6 попыток. Введи первую догадку:"
+MSG_GAME_START = "Я загадал слово из {length} букв. У тебя {max_attempts} {attempts_word}. Введи первую догадку:"
 
 # guess.py
 MSG_LENGTH_VALIDATE = "Введите слово из {length} букв."
@@ -73,7 +73,9 @@ SUGGESTED_ADD_WORD = "Предложить добавить слово"
 
 MSG_NOT_FOUND = "Слово «{guess}» не найдено в словаре."
 
-MSG_ATTEMPT = "Попытка {attempt} из 6"
+MSG_ATTEMPT = "Попытка {attempt} из {max_attempts}"
+
+MSG_CANDIDATES_LEFT = "🔎 Подходящих слов осталось: {count}"
     
 MSG_WIN = (
     "🎉 Поздравляю! Угадал за {attempts} {attempt_word}.\n"
@@ -124,6 +126,12 @@ STATE_OFF = "отключены"
 
 STATE_ON = "включены"
 
+# difficulty.py
+MSG_DIFFICULTY_STATE = "Сложность загадываемых слов: {level}. Нажмите /difficulty ещё раз, чтобы сменить."
+MSG_DIFFICULTY_UNAVAILABLE = "Уровни сложности пока недоступны: словарь ещё обрабатывается. Попробуйте позже."
+
+DIFFICULTY_NAMES = {"any": "любая", "easy": "лёгкая", "normal": "обычная", "hard": "сложная"}
+
 # stats.py
 ONLY_OUTSIDE_GAME = "Эту команду можно использовать только вне игры."
 
@@ -145,11 +153,19 @@ MSG_GLOBAL_STATS = (
     "💔 Поражений: {total_losses}\n"
     "🎯 Процент: {win_rate:.2f}%\n"
     "{top_line}"
+    "{leaderboard}"
+    "{rank_line}"
     "```"
 )
 
 MSG_TOP_PLAYER = "Сильнейший: @{username} ({wins} побед)\n\n"
 
+MSG_LEADERBOARD = "🏅 Топ-{count} по победам:\n{lines}\n"
+
+MSG_LEADERBOARD_LINE = "{place}. {username} — {wins}\n"
+
+MSG_YOUR_RANK = "📍 Ваше место: {rank} из {total}\n"
+
 
 # feedback.py
 FB_ONLY_OUTSIDE_GAME = ("Нельзя отправлять фидбек пока идет игра, выбор количества букв или после перезапуска.\n"
@@ -10,7 +10,12 @@ from telegram.ext import (
     filters
 )
 
-from src.main.config import (BOT_TOKEN)
+from src.main.config import (BOT_TOKEN, STORE_FLUSH_INTERVAL_MS, MAX_CONCURRENT_UPDATES)
+from src.storage.store import get_backend, load_indexes, flush_store, flush_store_job
+from src.storage.leaderboard import load_leaderboard
+from src.game.dictionary import get_dictionary
+from src.game.render import shutdown_render_pool
+from src.main.processor import PerUserUpdateProcessor
 
 from src.main.constants import (
     ASK_LENGTH, GUESSING,
@@ -25,6 +30,7 @@ from src.commands.guess import handle_guess, ignore_guess, suggest_white_callbac
 from src.commands.hint import hint, hint_not_allowed
 from src.commands.reset import reset, reset_global
 from src.commands.notification import notification_toggle, send_unfinished_games
+from src.commands.difficulty import difficulty_toggle, refresh_difficulty
 from src.commands.stats import my_stats, only_outside_game, global_stats
 
 from src.commands.feedback    import (feedback_not_allowed_ask,
@@ -55,6 +61,8 @@ from src.commands.suggestions import (suggestions_view,
 from src.commands.broadcast   import (broadcast_start,
                                       broadcast_send,
                                       broadcast_cancel,
+                                      resume_broadcast,
+                                      stop_broadcast,
 )
 
 load_dotenv()
@@ -66,6 +74,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Write out buffered store changes before the process exits
+async def post_shutdown(app):
+    await flush_store()
+    await shutdown_render_pool(app)
+
+
 def main():
     
     token = BOT_TOKEN
@@ -73,16 +87,33 @@ def main():
         logger.error("BOT_TOKEN не установлен")
         return
 
+    # open user store (migrates user_activity.json on first run)
+    get_backend()
+    load_indexes()
+    load_leaderboard()
+    # load word lists once, before the first guess
+    get_dictionary()
+
     app = (
         ApplicationBuilder()
         .token(token)
+        .concurrent_updates(PerUserUpdateProcessor(MAX_CONCURRENT_UPDATES))
         .post_init(set_commands)
+        .post_stop(stop_broadcast)
+        .post_shutdown(post_shutdown)
         .build()
     )
 	
     # send once on start
     app.job_queue.run_once(send_activity_periodic, when=0)
     app.job_queue.run_once(send_unfinished_games, when=1)
+    app.job_queue.run_once(resume_broadcast, when=2)
+    # difficulty scores of word lists changed since the last run
+    app.job_queue.run_once(refresh_difficulty, when=0)
+    # write-behind flush of the user store
+    if STORE_FLUSH_INTERVAL_MS > 0:
+        interval = STORE_FLUSH_INTERVAL_MS / 1000
+        app.job_queue.run_repeating(flush_store_job, interval=interval, first=interval)
 
 
     feedback_conv = ConversationHandler(
@@ -117,6 +148,7 @@ def main():
                 CommandHandler("hint", hint_not_allowed),
                 CommandHandler("reset", reset),
                 CommandHandler("notification", only_outside_game),
+                CommandHandler("difficulty", only_outside_game),
                 CommandHandler("my_stats", only_outside_game),
                 CommandHandler("global_stats", only_outside_game),
             ],
@@ -128,6 +160,7 @@ def main():
                 CommandHandler("hint", hint),
                 CommandHandler("reset", reset),
                 CommandHandler("notification", only_outside_game),
+                CommandHandler("difficulty", only_outside_game),
                 CommandHandler("my_stats", only_outside_game),
                 CommandHandler("global_stats", only_outside_game),
             ],
@@ -190,6 +223,7 @@ def main():
         ("hint", hint_not_allowed),
         ("reset", reset_global),
         ("notification", notification_toggle),
+        ("difficulty", difficulty_toggle),
         ("my_stats", my_stats),
         ("global_stats", global_stats),
         ("dict_file", dict_file),
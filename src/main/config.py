@@ -11,12 +11,77 @@ FONTS_DIR  = ASSETS_DIR / "fonts"
 
 # Path to JSON file
 BASE_FILE         = DATA_DIR / "base_words.json"
+COMPILED_FILE     = DATA_DIR / "base_words.compiled"
+# Secret difficulty scores (python -m src.game.difficulty)
+DIFFICULTY_FILE   = DATA_DIR / "base_words.difficulty.npz"
 USER_FILE= DATA_DIR / "user_activity.json"
+USER_DB           = DATA_DIR / "user_activity.db"
 SUGGESTIONS_FILE  = DATA_DIR / "suggestions.json"
+# Running broadcast (recipients and text) and its progress, for resume after restart
+BROADCAST_FILE        = DATA_DIR / "broadcast.json"
+BROADCAST_CURSOR_FILE = DATA_DIR / "broadcast.cursor.json"
+# Precomputed guess x secret pattern tables (python -m src.game.pattern_tables),
+# named after the word lists they were built from
+PATTERN_TABLE_FILE    = "patterns_{length}_{fingerprint}.npy"
+PATTERN_TABLE_LENGTHS = (4, 5, 6)
 
 # Path to Font
 FONT_FILE         = FONTS_DIR / "DejaVuSans-Bold.ttf"
 
+# User store backend: "sqlite" (default) or "json" (legacy single file)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite").lower()
+# Write-behind: saved records are buffered and written in one batch every
+# STORE_FLUSH_INTERVAL_MS (the durability window) or as soon as
+# STORE_FLUSH_MAX_PENDING records are dirty. 0 writes every save through.
+STORE_FLUSH_INTERVAL_MS = int(os.getenv("STORE_FLUSH_INTERVAL_MS", "1000"))
+STORE_FLUSH_MAX_PENDING = int(os.getenv("STORE_FLUSH_MAX_PENDING", "200"))
+
+# Board rendering: "thread" or "process" pool, number of workers
+# and how many renders may be queued or running before new guesses wait
+RENDER_EXECUTOR    = os.getenv("RENDER_EXECUTOR", "thread").lower()
+RENDER_WORKERS     = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", "32"))
+# Boards of running games kept for incremental rendering (per render process)
+RENDER_STATE_CACHE = int(os.getenv("RENDER_STATE_CACHE", "256"))
+# "supersample": draw at 3x and downscale, "direct": draw at target size (cheaper)
+RENDER_MODE = os.getenv("RENDER_MODE", "supersample").lower()
+# Board image encoding: "png" (lossless), or opt-in "png_palette" (quantized,
+# smaller and faster but lossy at glyph edges) or "webp"
+RENDER_FORMAT         = os.getenv("RENDER_FORMAT", "png").lower()
+RENDER_COMPRESS_LEVEL = int(os.getenv("RENDER_COMPRESS_LEVEL", "6"))
+RENDER_PALETTE_COLORS = int(os.getenv("RENDER_PALETTE_COLORS", "64"))
+RENDER_WEBP_QUALITY   = int(os.getenv("RENDER_WEBP_QUALITY", "90"))
+
+# Bulk sends (broadcast, reminders): Telegram allows about 30 messages/s per bot
+SEND_RATE        = float(os.getenv("SEND_RATE", "30"))
+SEND_CONCURRENCY = int(os.getenv("SEND_CONCURRENCY", "8"))
+SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", "3"))
+# Seconds between broadcast progress reports (and cursor checkpoints)
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", "10"))
+
+# /hint: "random" (a word sharing some letters with the secret) or "smart"
+# (the most informative word for the remaining candidates, random as fallback)
+HINT_MODE = os.getenv("HINT_MODE", "random").lower()
+# Time the smart hint may spend, ms: one value for all lengths or "4:50,8:200,11:300"
+_hint_budget = os.getenv("HINT_TIME_BUDGET_MS", "150")
+HINT_TIME_BUDGET_MS = (
+    {int(k): float(v) for k, v in (item.split(":") for item in _hint_budget.split(","))}
+    if ":" in _hint_budget else {length: float(_hint_budget) for length in range(4, 12)}
+)
+
+# Secret difficulty for users who did not choose one with /difficulty:
+# any (all words, as before difficulty levels) | easy | normal | hard
+DEFAULT_DIFFICULTY = os.getenv("DIFFICULTY", "any").lower()
+# Recomputing stale difficulty scores in the bot: simulated games per word, processes
+DIFFICULTY_REPEAT  = int(os.getenv("DIFFICULTY_REPEAT", "50"))
+DIFFICULTY_WORKERS = int(os.getenv("DIFFICULTY_WORKERS", str(os.cpu_count() or 2)))
+
+# Players shown in /global_stats
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "10"))
+
+# Updates processed in parallel (updates of one user always run in order)
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+
 # Bot Token and Admin ID
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_ID  = int(os.getenv("ADMIN_ID", "0"))
\ No newline at end of file
@@ -4,4 +4,12 @@ ASK_LENGTH, GUESSING, FEEDBACK_CHOOSE, FEEDBACK_WORD, REMOVE_INPUT, BROADCAST= r
 # Color
 GREEN = "🟩"
 YELLOW = "🟨"
-WHITE = "⬜"
\ No newline at end of file
+WHITE = "⬜"
+
+# Game rules
+MAX_ATTEMPTS = 6
+# Letters shared with the secret by a /hint word, per word length
+HINT_LETTERS = {4: 1, 5: 2, 6: 2, 7: 3, 8: 3, 9: 4, 10: 4, 11: 5}
+# Secret difficulty buckets, easiest first; "any" picks from all words
+DIFFICULTY_LEVELS = ("easy", "normal", "hard")
+DIFFICULTY_CHOICES = ("any", *DIFFICULTY_LEVELS)
@@ -0,0 +1,33 @@
+from typing import Awaitable
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from src.storage.locks import user_lock
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates of different users concurrently and updates of one user in order.
+    Keeps ConversationHandler states consistent (they are per user and chat,
+    and the bot works in private chats). The user lock is taken before a
+    concurrency slot, so a user flooding the bot waits without occupying
+    slots of others.
+    """
+
+    async def process_update(self, update: object, coroutine: Awaitable) -> None:
+        user = update.effective_user if isinstance(update, Update) else None
+        if user is None:
+            await super().process_update(update, coroutine)
+            return
+        async with user_lock(user.id):
+            await super().process_update(update, coroutine)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, Sequence
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+from src.main.config import SEND_RATE, SEND_CONCURRENCY, SEND_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Rate limiter: `rate` tokens per second, bursts up to `capacity`.
+    pause() stops everybody, Telegram's flood limit is per bot, not per chat.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # the lock keeps waiters in FIFO order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+# Shared by every bulk send of the process
+telegram_bucket = TokenBucket(SEND_RATE)
+
+
+def _seconds(retry_after) -> float:
+    # int in PTB 21, timedelta in later versions
+    return retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+
+
+class BulkSender:
+    """
+    Sends many messages with bounded concurrency under the shared rate limit.
+    RetryAfter pauses all senders for the requested time, network errors are
+    retried with exponential backoff, Forbidden/BadRequest fail at once.
+    Takes any object with an async send_message(chat_id, text), e.g. a fake bot in tests.
+    """
+
+    def __init__(self, bot, concurrency: int = SEND_CONCURRENCY, bucket: TokenBucket | None = None,
+                 max_retries: int = SEND_MAX_RETRIES, backoff: float = 0.5):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.bucket = bucket or telegram_bucket
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def send(self, chat_id: int, text: str) -> str | None:
+        """Returns None on success, otherwise the error text."""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+                return None
+            except RetryAfter as e:
+                delay = _seconds(e.retry_after)
+                logger.warning(f"Flood limit, pausing sends for {delay:.0f} s")
+                self.bucket.pause(delay)
+                error = str(e)
+            except (Forbidden, BadRequest) as e:
+                # blocked the bot, deleted account, bad chat id: retrying won't help
+                return str(e)
+            except NetworkError as e:
+                error = str(e)
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+            except Exception as e:
+                return str(e)
+        return error
+
+    async def run(self, messages: Sequence[tuple[int, str]],
+                  on_result: Callable[[int, str | None], None],
+                  indices: Iterable[int] | None = None) -> None:
+        """
+        Send messages[i] = (chat_id, text) for every index (all by default) in order;
+        on_result(i, error) is called as each one finishes.
+        """
+        pending = iter(range(len(messages)) if indices is None else indices)
+
+        async def worker():
+            # the iterator is shared: every index goes to exactly one worker
+            for i in pending:
+                chat_id, text = messages[i]
+                on_result(i, await self.send(chat_id, text))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
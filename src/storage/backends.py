@@ -0,0 +1,251 @@
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterator
+
+from src.storage.files import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+
+def empty_global() -> dict:
+    return {
+        "total_games": 0,
+        "total_wins": 0,
+        "total_losses": 0,
+        "win_rate": 0.0
+    }
+
+
+def empty_store() -> dict:
+    return {"users": {}, "global": empty_global()}
+
+
+def normalize_store(data) -> dict:
+    """Fix structure of a store loaded from disk (missing keys, wrong types)."""
+    if not isinstance(data, dict):
+        return empty_store()
+    if not isinstance(data.get("users"), dict):
+        data["users"] = {}
+    if not isinstance(data.get("global"), dict):
+        data["global"] = empty_global()
+
+    # add key to global
+    for key, val in empty_global().items():
+        data["global"].setdefault(key, val)
+
+    return data
+
+
+class JsonBackend:
+    """
+    Legacy backend: the whole store is one JSON file.
+    Every per-user operation reads (and writes) the full file.
+    Writes are atomic; the previous version is kept as <name>.bak and
+    used when the main file is missing or unreadable.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.backup = path.with_name(path.name + ".bak")
+        # False while the main file is damaged: it must not replace the good backup
+        self._main_ok = True
+
+    @staticmethod
+    def _read(path: Path) -> dict | None:
+        """Parsed store, or None if the file is missing, empty or not valid JSON."""
+        try:
+            raw = path.read_text("utf-8").strip()
+        except FileNotFoundError:
+            return None
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
+
+    def load_all(self) -> dict:
+        data = self._read(self.path)
+        if data is not None:
+            self._main_ok = True
+            return normalize_store(data)
+
+        damaged = self.path.exists()
+        data = self._read(self.backup)
+        if data is None:
+            return empty_store()
+
+        if damaged:
+            logger.error(f"{self.path.name} is damaged, using last good copy {self.backup.name}")
+        self._main_ok = not damaged
+        return normalize_store(data)
+
+    def save_all(self, store: dict) -> None:
+        atomic_write_text(
+            self.path,
+            json.dumps(store, ensure_ascii=False, indent=2),
+            backup=self.backup if self._main_ok else None
+        )
+        self._main_ok = True
+
+    def get_user(self, user_id: str) -> dict | None:
+        return self.load_all()["users"].get(user_id)
+
+    def get_users(self, user_ids) -> dict[str, dict]:
+        users = self.load_all()["users"]
+        return {uid: users[uid] for uid in user_ids if uid in users}
+
+    def put_user(self, user_id: str, data: dict) -> None:
+        self.put_users({user_id: data})
+
+    def put_users(self, users: dict[str, dict]) -> None:
+        store = self.load_all()
+        store["users"].update(users)
+        self.save_all(store)
+
+    def iter_users(self) -> Iterator[tuple[str, dict]]:
+        yield from self.load_all()["users"].items()
+
+    def get_global(self) -> dict:
+        return self.load_all()["global"]
+
+    def put_global(self, data: dict) -> None:
+        store = self.load_all()
+        store["global"] = data
+        self.save_all(store)
+
+    def is_empty(self) -> bool:
+        return not self.load_all()["users"]
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend:
+    """
+    SQLite backend in WAL mode: one row per user (JSON blob), global stats in `meta`.
+    A guess reads and writes only the row of its user.
+    Reads go through a second, read-only connection: WAL lets them run while
+    a batch write (the write-behind flush) holds the writer.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS users (user_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(
+            f"{Path(path).resolve().as_uri()}?mode=ro", uri=True,
+            check_same_thread=False, isolation_level=None
+        )
+
+    def _put_rows(self, users: dict[str, dict]) -> None:
+        self._conn.executemany(
+            "INSERT INTO users (user_id, data) VALUES (?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+            [(uid, json.dumps(data, ensure_ascii=False)) for uid, data in users.items()]
+        )
+
+    def _put_global(self, data: dict) -> None:
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('global', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (json.dumps(data, ensure_ascii=False),)
+        )
+
+    def load_all(self) -> dict:
+        return normalize_store({
+            "users": dict(self.iter_users()),
+            "global": self.get_global(),
+        })
+
+    def save_all(self, store: dict) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM users")
+                self._put_rows(store.get("users", {}))
+                self._put_global(store.get("global", empty_global()))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_user(self, user_id: str) -> dict | None:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT data FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_users(self, user_ids) -> dict[str, dict]:
+        ids = list(user_ids)
+        found = {}
+        # stay below SQLite's limit on bound parameters
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            with self._read_lock:
+                rows = self._reader.execute(
+                    f"SELECT user_id, data FROM users WHERE user_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            for uid, data in rows:
+                found[uid] = json.loads(data)
+        return found
+
+    def put_user(self, user_id: str, data: dict) -> None:
+        with self._lock:
+            self._put_rows({user_id: data})
+
+    def put_users(self, users: dict[str, dict]) -> None:
+        if not users:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._put_rows(users)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def iter_users(self) -> Iterator[tuple[str, dict]]:
+        with self._read_lock:
+            rows = self._reader.execute("SELECT user_id, data FROM users").fetchall()
+        for uid, data in rows:
+            yield uid, json.loads(data)
+
+    def get_global(self) -> dict:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT value FROM meta WHERE key = 'global'"
+            ).fetchone()
+        data = json.loads(row[0]) if row else {}
+        for key, val in empty_global().items():
+            data.setdefault(key, val)
+        return data
+
+    def put_global(self, data: dict) -> None:
+        with self._lock:
+            self._put_global(data)
+
+    def is_empty(self) -> bool:
+        with self._read_lock:
+            row = self._reader.execute("SELECT 1 FROM users LIMIT 1").fetchone()
+        return row is None
+
+    def close(self) -> None:
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+def _fsync_dir(path: Path) -> None:
+    # make the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, backup: Path | None = None) -> None:
+    """
+    Replace `path` with `text` so that a crash leaves either the old or the new file, never half of one.
+    With `backup`, the previous file is moved there first (readers fall back to it if `path` is missing).
+    """
+    # unique temp name: concurrent writers of the same file never share one
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            # mkstemp creates 0600, keep the mode the file had
+            try:
+                os.fchmod(f.fileno(), os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                os.fchmod(f.fileno(), 0o644)
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if backup is not None and path.exists():
+            os.replace(path, backup)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(path.parent)
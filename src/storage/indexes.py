@@ -0,0 +1,39 @@
+from typing import Callable, Iterable
+
+
+# index name -> does the user record belong to it
+INDEXES: dict[str, Callable[[dict], bool]] = {
+    "active_game": lambda u: "current_game" in u,
+    "notify":      lambda u: bool(u.get("notify_on_wakeup", True)),
+    "banned":      lambda u: bool(u.get("banned", False)),
+    # unbanned, but has not written since (see check_ban_status)
+    "unbanned":    lambda u: bool(u.get("was_banned")),
+    "suggested":   lambda u: bool(u.get("suggested_words")),
+}
+
+
+class UserIndexes:
+    """
+    Secondary indexes: sets of user ids per property of the record, plus all ids.
+    The store updates them on every save, so bulk jobs visit only the users they need.
+    """
+
+    def __init__(self, users: Iterable[tuple[str, dict]] = ()):
+        self.all: set[str] = set()
+        self._sets: dict[str, set[str]] = {name: set() for name in INDEXES}
+        for uid, data in users:
+            self.update(uid, data)
+
+    def update(self, user_id: str, data: dict) -> None:
+        self.all.add(user_id)
+        for name, belongs in INDEXES.items():
+            if belongs(data):
+                self._sets[name].add(user_id)
+            else:
+                self._sets[name].discard(user_id)
+
+    def __getitem__(self, name: str) -> set[str]:
+        return self._sets[name]
+
+    def contains(self, name: str, user_id: str) -> bool:
+        return user_id in self._sets[name]
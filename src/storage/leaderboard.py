@@ -0,0 +1,68 @@
+import logging
+from sortedcontainers import SortedList
+
+from src.storage.store import iter_users
+
+logger = logging.getLogger(__name__)
+
+
+def display_name(user: dict) -> str:
+    return user.get("username") or user.get("first_name", "")
+
+
+class Leaderboard:
+    """
+    Users with at least one win, ordered by wins (most first, ties by user id).
+    Updated on every won game; update, rank and top-N are O(log n), no scan over the user table.
+    """
+
+    def __init__(self):
+        self._order = SortedList()  # (-wins, user_id)
+        self._wins: dict[str, int] = {}
+        self._names: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def update(self, user_id: str, wins: int, name: str) -> None:
+        uid = str(user_id)
+        old = self._wins.pop(uid, None)
+        if old is not None:
+            self._order.remove((-old, uid))
+        if wins > 0:
+            self._order.add((-wins, uid))
+            self._wins[uid] = wins
+            self._names[uid] = name
+        else:
+            self._names.pop(uid, None)
+
+    # [(user_id, wins, name), ...] best first
+    def top(self, n: int) -> list[tuple[str, int, str]]:
+        return [(uid, -neg_wins, self._names[uid]) for neg_wins, uid in self._order.islice(0, n)]
+
+    # 1-based place, users with equal wins share it; None without wins
+    def rank(self, user_id: str) -> int | None:
+        wins = self._wins.get(str(user_id))
+        if wins is None:
+            return None
+        return self._order.bisect_left((-wins, "")) + 1
+
+
+_board: Leaderboard | None = None
+
+
+# Seed from the store (once on start, or after the backend is replaced)
+def load_leaderboard() -> Leaderboard:
+    global _board
+    board = Leaderboard()
+    for uid, udata in iter_users():
+        board.update(uid, udata.get("stats", {}).get("wins", 0), display_name(udata))
+    _board = board
+    logger.info(f"Leaderboard loaded: {len(board)} players")
+    return board
+
+
+def get_leaderboard() -> Leaderboard:
+    if _board is None:
+        return load_leaderboard()
+    return _board
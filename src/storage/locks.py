@@ -0,0 +1,57 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Hashable
+
+
+class _Entry:
+    __slots__ = ("lock", "owner", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.owner: asyncio.Task | None = None
+        # tasks holding or waiting for the lock
+        self.users = 0
+
+
+class KeyedLocks:
+    """
+    One asyncio lock per key, created on first use and dropped when nobody holds or waits for it.
+    Re-entrant within a task: the task holding a key may lock it again (update processor, then handler).
+    """
+
+    def __init__(self):
+        self._entries: dict[Hashable, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        task = asyncio.current_task()
+        entry = self._entries.get(key)
+        if entry is not None and entry.owner is task:
+            yield
+            return
+
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+        entry.users += 1
+        try:
+            async with entry.lock:
+                entry.owner = task
+                try:
+                    yield
+                finally:
+                    entry.owner = None
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._entries[key]
+
+
+# Updates and store changes of one user run one at a time, different users in parallel
+user_locks = KeyedLocks()
+
+
+def user_lock(user_id):
+    return user_locks.hold(str(user_id))
@@ -1,7 +1,18 @@
+import asyncio
+import copy
 import json
+import logging
 from datetime import datetime
+from pathlib import Path
 from zoneinfo import ZoneInfo
-from src.main.config import SUGGESTIONS_FILE, USER_FILE
+from src.main.config import (SUGGESTIONS_FILE, USER_FILE, USER_DB, STORAGE_BACKEND,
+                             STORE_FLUSH_INTERVAL_MS, STORE_FLUSH_MAX_PENDING)
+from src.storage.backends import JsonBackend, SqliteBackend
+from src.storage.files import atomic_write_text
+from src.storage.locks import user_lock
+from src.storage.indexes import UserIndexes
+
+logger = logging.getLogger(__name__)
 
 # Return {'black': set(...), 'white': set(...), 'add': set(...)} without dublicate.
 def load_suggestions() -> dict[str, set[str]]:
@@ -28,79 +39,319 @@ def save_suggestions(sugg: dict[str, set[str]]):
         "white": sorted(sugg["white"]),
         "add": sorted(sugg["add"]),
     }
-    with SUGGESTIONS_FILE.open("w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    atomic_write_text(SUGGESTIONS_FILE, json.dumps(out, ensure_ascii=False, indent=2))
 
 
 # load once on start
 suggestions = load_suggestions()
 
-# load user_activity.json
-def load_store() -> dict:
-    template = {
-        "users": {},
-        "global": {
-            "total_games": 0,
-            "total_wins": 0,
-            "total_losses": 0,
-            "win_rate": 0.0
-        }
-    }
-    if not USER_FILE.exists():
-        return template
+# Storage backend, opened on first use
+_backend = None
 
-    raw = USER_FILE.read_text("utf-8").strip()
-    if not raw:
-        return template
 
+def _open_backend():
+    if STORAGE_BACKEND == "json":
+        return JsonBackend(USER_FILE)
+
+    backend = SqliteBackend(USER_DB)
+    # one-shot migration from the old user_activity.json
+    if backend.is_empty() and USER_FILE.exists():
+        migrate_json_store(USER_FILE, backend)
+    return backend
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = _open_backend()
+    return _backend
+
+
+# Replace the backend (tools and benchmarks use a temporary store)
+def set_backend(backend) -> None:
+    global _backend, _indexes
+    # pending writes belong to the old backend
+    if _backend is not None:
+        flush_store_now()
+    _backend = backend
+    _indexes = None
+
+
+# Copy user_activity.json into another backend and move the file aside
+def migrate_json_store(path: Path, backend) -> int:
+    store = JsonBackend(path).load_all()
+    backend.save_all(store)
+    done = path.with_name(path.name + ".migrated")
+    path.rename(done)
+    logger.info(f"Migrated {len(store['users'])} users from {path.name}, old file moved to {done.name}")
+    return len(store["users"])
+
+
+# Write-behind buffer. Saves land in _pending_*, a flush moves them to
+# _flushing_* while the batch is written in a thread. Reads look at
+# pending, then flushing, then the backend. Buffered records are copies,
+# so handlers may keep mutating what they saved or loaded.
+_pending_users: dict[str, dict] = {}
+_pending_global: dict | None = None
+_flushing_users: dict[str, dict] = {}
+_flushing_global: dict | None = None
+_flush_lock = asyncio.Lock()
+_flush_task: asyncio.Task | None = None
+
+
+def _write_through() -> bool:
+    return STORE_FLUSH_INTERVAL_MS <= 0
+
+
+def pending_count() -> int:
+    return len(_pending_users) + (_pending_global is not None)
+
+
+def _take_pending() -> tuple[dict[str, dict], dict | None]:
+    global _pending_users, _pending_global, _flushing_users, _flushing_global
+    _flushing_users, _pending_users = _pending_users, {}
+    _flushing_global, _pending_global = _pending_global, None
+    return _flushing_users, _flushing_global
+
+
+def _write_batch(users: dict[str, dict], global_data: dict | None) -> None:
+    backend = get_backend()
+    backend.put_users(users)
+    if global_data is not None:
+        backend.put_global(global_data)
+
+
+def _finish_flush(ok: bool) -> None:
+    global _pending_global, _flushing_users, _flushing_global
+    if not ok:
+        # keep the batch unless a newer save replaced it meanwhile
+        for uid, data in _flushing_users.items():
+            _pending_users.setdefault(uid, data)
+        if _pending_global is None:
+            _pending_global = _flushing_global
+    _flushing_users, _flushing_global = {}, None
+
+
+# Write the buffer in a worker thread, the event loop keeps serving updates
+async def flush_store() -> None:
+    async with _flush_lock:
+        users, global_data = _take_pending()
+        if not users and global_data is None:
+            return
+        ok = False
+        try:
+            await asyncio.to_thread(_write_batch, users, global_data)
+            ok = True
+        except Exception:
+            logger.exception(f"Store flush of {len(users)} users failed, will retry")
+        finally:
+            _finish_flush(ok)
+
+
+# Blocking flush for code without an event loop (backend swap, tools)
+def flush_store_now() -> None:
+    users, global_data = _take_pending()
+    ok = False
     try:
-        data = json.loads(raw)
-    except json.JSONDecodeError:
-        return template
+        if users or global_data is not None:
+            _write_batch(users, global_data)
+        ok = True
+    finally:
+        _finish_flush(ok)
 
-    # check structure
-    if not isinstance(data, dict):
-        return template
-    if not isinstance(data.get("users"), dict):
-        data["users"] = {}
-    if not isinstance(data.get("global"), dict):
-        data["global"] = template["global"].copy()
 
-    # add key to global
-    for key, val in template["global"].items():
-        data["global"].setdefault(key, val)
+async def flush_store_job(context) -> None:
+    await flush_store()
 
-    return data
 
-# save user_activity.json
-def save_store(store: dict) -> None:
-    USER_FILE.write_text(
-        json.dumps(store, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+# Flush early once enough records are dirty
+def _after_save() -> None:
+    global _flush_task
+    if pending_count() < STORE_FLUSH_MAX_PENDING:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush_store_now()
+        return
+    if _flush_task is None or _flush_task.done():
+        _flush_task = loop.create_task(flush_store())
 
-# Create or upload user in store['users']:
-def update_user_activity(user) -> None:
-    
-    store = load_store()
-    uid = str(user.id)
-    users = store["users"]
 
+def _buffered_user(user_id: str) -> dict | None:
+    data = _pending_users.get(user_id)
+    if data is None:
+        data = _flushing_users.get(user_id)
+    return copy.deepcopy(data) if data is not None else None
+
+
+# Whole store: {'users': {...}, 'global': {...}}. Only for admin dumps and bulk jobs.
+def load_store() -> dict:
+    store = get_backend().load_all()
+    for uid, data in {**_flushing_users, **_pending_users}.items():
+        store["users"][uid] = copy.deepcopy(data)
+    store["global"] = load_global()
+    return store
+
+
+# One user record or None
+def load_user(user_id: str) -> dict | None:
+    uid = str(user_id)
+    buffered = _buffered_user(uid)
+    if buffered is not None:
+        return buffered
+    return get_backend().get_user(uid)
+
+
+def save_user(user_id: str, data: dict) -> None:
+    save_users({str(user_id): data})
+
+
+# Save several user records at once
+def save_users(users: dict[str, dict]) -> None:
+    if _indexes is not None:
+        for uid, data in users.items():
+            _indexes.update(str(uid), data)
+    if _write_through():
+        get_backend().put_users(users)
+        return
+    for uid, data in users.items():
+        _pending_users[str(uid)] = copy.deepcopy(data)
+    _after_save()
+
+
+# Several user records by id (missing ids are left out)
+def load_users(user_ids) -> dict[str, dict]:
+    found, rest = {}, []
+    for uid in user_ids:
+        buffered = _buffered_user(uid)
+        if buffered is not None:
+            found[uid] = buffered
+        else:
+            rest.append(uid)
+    found.update(get_backend().get_users(rest))
+    return found
+
+
+# Apply change(record) to every user it changes (returns a truthy value), each under
+# its user lock, so that an update of that user in flight can't overwrite the change.
+# `index` limits the pass to the users of one secondary index. Returns the sum of the results.
+async def update_users(change, index: str | None = None) -> int:
+    total = 0
+    users = iter_users() if index is None else users_in(index)
+    for uid, data in users:
+        # dry run on the snapshot, the real change on a fresh copy under the lock
+        if not change(data):
+            continue
+        async with user_lock(uid):
+            fresh = load_user(uid)
+            result = change(fresh) if fresh is not None else 0
+            if result:
+                save_user(uid, fresh)
+                total += result
+    return total
+
+
+def iter_users():
+    overlay = {**_flushing_users, **_pending_users}
+    for uid, data in get_backend().iter_users():
+        if uid in overlay:
+            data = copy.deepcopy(overlay.pop(uid))
+        yield uid, data
+    # buffered users not written yet
+    for uid, data in overlay.items():
+        yield uid, copy.deepcopy(data)
+
+
+def load_global() -> dict:
+    data = _pending_global if _pending_global is not None else _flushing_global
+    if data is not None:
+        return copy.deepcopy(data)
+    return get_backend().get_global()
+
+
+def save_global(data: dict) -> None:
+    global _pending_global
+    if _write_through():
+        get_backend().put_global(data)
+        return
+    _pending_global = copy.deepcopy(data)
+    _after_save()
+
+
+# Whole store as user_activity.json content (for admin)
+def dump_store_json() -> bytes:
+    return json.dumps(load_store(), ensure_ascii=False, indent=2).encode("utf-8")
+
+class StoreSession:
+    """
+    Unit of work for one update: the user's record is loaded at most once,
+    handlers and helpers change it in place and mark it dirty,
+    and flush() writes it back once if anything changed.
+    Global stats are not part of it: they are shared by all users,
+    so they are loaded and saved in one step (see handle_guess).
+    """
+
+    def __init__(self, user_id: str, update_id: int | None = None):
+        self.user_id = str(user_id)
+        self.update_id = update_id
+        self._user: dict | None = None
+        self._loaded = False
+        self._dirty = False
+
+    @property
+    def user(self) -> dict | None:
+        if not self._loaded:
+            self._user = load_user(self.user_id)
+            self._loaded = True
+        return self._user
+
+    # Record of the user, `default` is used (not saved yet) if there is none
+    def get_or_create(self, default: dict) -> dict:
+        if self.user is None:
+            self._user = default
+        return self._user
+
+    def mark_dirty(self) -> None:
+        self._dirty = True
+
+    def flush(self) -> None:
+        if self._dirty and self._user is not None:
+            save_user(self.user_id, self._user)
+        self._dirty = False
+
+
+# Session of the current update, reused by every handler that runs for it
+def open_session(context, user_id: str, update_id: int | None = None) -> StoreSession:
+    session = getattr(context, "store_session", None)
+    if session is None or session.user_id != str(user_id) or session.update_id != update_id:
+        session = StoreSession(user_id, update_id)
+        context.store_session = session
+    return session
+
+
+def user_session(context) -> StoreSession:
+    session = getattr(context, "store_session", None)
+    if session is None:
+        raise RuntimeError("handler is not wrapped with @store_session")
+    return session
+
+
+# Create or upload user in store['users']:
+def update_user_activity(session: StoreSession, user) -> None:
     # if new user:
-    if uid not in users:
-        users[uid] = {
-            "first_name": user.first_name,
-            "suggested_words": [], 
-            "stats": {
-                "games_played": 0,
-                "wins": 0,
-                "losses": 0,
-                "win_rate": 0.0
-            },
-            "banned": False
-        }
+    u = session.get_or_create({
+        "first_name": user.first_name,
+        "suggested_words": [], 
+        "stats": {
+            "games_played": 0,
+            "wins": 0,
+            "losses": 0,
+            "win_rate": 0.0
+        },
+        "banned": False
+    })
 
-    u = users[uid]
     # upload
     u["first_name"]    = user.first_name
     u["last_name"]     = user.last_name
@@ -110,18 +361,57 @@ def update_user_activity(user) -> None:
     u["language_code"] = user.language_code
     u["last_seen_msk"] = datetime.now(ZoneInfo("Europe/Moscow")).isoformat()
 
-    save_store(store)
+    session.mark_dirty()
 
 
-def clear_notification_flag(user_id: str):
-    store = load_store()
-    u = store["users"].get(user_id)
+def clear_notification_flag(session: StoreSession) -> None:
+    u = session.user
     if u and u.get("notified"):
         u["notified"] = False
-        save_store(store)
+        session.mark_dirty()
+
+# Secondary indexes (see indexes.py), seeded from the store once and
+# then updated by save_users
+_indexes: UserIndexes | None = None
+
+
+def load_indexes() -> UserIndexes:
+    global _indexes
+    _indexes = UserIndexes(iter_users())
+    return _indexes
+
+
+def get_indexes() -> UserIndexes:
+    if _indexes is None:
+        return load_indexes()
+    return _indexes
+
+
+# Ids of an index; a copy, safe to keep while the store changes
+def user_ids_in(index: str) -> set[str]:
+    return set(get_indexes()[index])
+
+
+# (user_id, record) of the users in an index, loaded in one batch
+def users_in(index: str):
+    return load_users(sorted(user_ids_in(index))).items()
+
+
+def has_active_game(user_id: str) -> bool:
+    return get_indexes().contains("active_game", str(user_id))
+
 
 # check ban flag
 async def is_banned(user_id: str) -> bool:
-    store = load_store()
-    user_data = store["users"].get(str(user_id), {})
-    return user_data.get("banned", False)
\ No newline at end of file
+    return get_indexes().contains("banned", str(user_id))
+
+
+def was_unbanned(user_id: str) -> bool:
+    return get_indexes().contains("unbanned", str(user_id))
+
+
+# First message after unban: drop the was_banned flag
+def clear_unbanned(session: StoreSession) -> None:
+    u = session.user
+    if u and u.pop("was_banned", None) is not None:
+        session.mark_dirty()
@@ -0,0 +1,74 @@
+"""Broadcast cancelled mid-way and resumed from the checkpoint on disk."""
+import asyncio
+
+from telegram.error import Forbidden, RetryAfter
+
+from benchmarks.fakes import FakeBot
+from src.commands import broadcast
+from src.commands.broadcast import BroadcastJob, run_broadcast
+from src.main.sender import BulkSender, TokenBucket
+
+ADMIN = 1
+BLOCKED = 1050
+FLOODED = 1100
+
+
+class FlakyBot(FakeBot):
+    """Slow sends, one flood limit, one user who blocked the bot; signals after `stop_after` sends."""
+
+    def __init__(self, stop_after: int | None = None):
+        super().__init__()
+        self.stop_after = stop_after
+        self.reached = asyncio.Event()
+        self.flooded = False
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await asyncio.sleep(0.001)
+        if chat_id == BLOCKED:
+            raise Forbidden("bot was blocked by the user")
+        if chat_id == FLOODED and not self.flooded:
+            self.flooded = True
+            raise RetryAfter(0.05)
+        result = await super().send_message(chat_id, text, **kwargs)
+        if self.stop_after is not None and len(self.sent) >= self.stop_after:
+            self.reached.set()
+        return result
+
+
+def sender(bot) -> BulkSender:
+    return BulkSender(bot, concurrency=8, bucket=TokenBucket(10000), backoff=0.01)
+
+
+def test_resume_after_cancel_sends_each_message_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(broadcast, "BROADCAST_FILE", tmp_path / "broadcast.json")
+    monkeypatch.setattr(broadcast, "BROADCAST_CURSOR_FILE", tmp_path / "broadcast.cursor.json")
+    chat_ids = list(range(1001, 1301))
+
+    async def scenario():
+        first = FlakyBot(stop_after=150)
+        job = BroadcastJob(text="hello", chat_ids=chat_ids, admin_chat=ADMIN)
+        job.save()
+        # checkpoint very often: the reporter is writing when the cancel comes
+        task = asyncio.create_task(run_broadcast(first, job, sender(first), progress_interval=0.001))
+        await first.reached.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+        resumed = BroadcastJob.load()
+        assert resumed is not None and 0 < resumed.done < len(chat_ids)
+        second = FlakyBot()
+        second.flooded = first.flooded
+        await run_broadcast(second, resumed, sender(second), progress_interval=0.001)
+        return first, second, resumed
+
+    first, second, job = asyncio.run(scenario())
+
+    delivered = [chat_id for bot in (first, second) for chat_id, _ in bot.sent if chat_id != ADMIN]
+    assert sorted(delivered) == [c for c in chat_ids if c != BLOCKED]
+    assert job.failed == [BLOCKED]
+    assert job.sent + len(job.failed) == len(chat_ids)
+    assert not (tmp_path / "broadcast.json").exists()
+    assert not list(tmp_path.glob("*.tmp"))
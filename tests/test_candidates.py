@@ -0,0 +1,72 @@
+"""Candidate bitsets against a brute-force filter of the word list."""
+import random
+
+import pytest
+
+from src.game.candidates import candidate_indices, update_candidates
+from src.game.dictionary import Dictionary, get_dictionary
+from src.game.logic import make_feedback
+
+
+def brute_force(dictionary, secret, guesses):
+    return [w for w in dictionary.words(len(secret))
+            if all(make_feedback(w, g) == make_feedback(secret, g) for g in guesses)]
+
+
+def random_game(dictionary, length, rng, guesses=4):
+    secret = rng.choice(dictionary.words(length))
+    return secret, [rng.choice(dictionary.valid_words(length)) for _ in range(guesses)]
+
+
+def expected_count(dictionary, secret, guesses):
+    # the secret counts even when it is not a main word
+    return len(brute_force(dictionary, secret, guesses)) + (0 if dictionary.is_main(secret) else 1)
+
+
+@pytest.mark.parametrize("length", [4, 5, 6, 8, 11])
+def test_guess_by_guess_matches_brute_force(length):
+    dictionary = get_dictionary()
+    rng = random.Random(length)
+    for _ in range(20):
+        secret, guesses = random_game(dictionary, length, rng)
+        game = {"secret": secret, "guesses": []}
+        for guess in guesses:
+            game["guesses"].append(guess)
+            assert update_candidates(game, dictionary) == expected_count(dictionary, secret, game["guesses"])
+            words = dictionary.words(length)
+            assert [words[i] for i in candidate_indices(game, dictionary)] == brute_force(dictionary, secret, game["guesses"])
+
+
+def test_record_without_candidates_is_rebuilt_from_all_guesses():
+    dictionary = get_dictionary()
+    rng = random.Random(1)
+    for _ in range(20):
+        secret, guesses = random_game(dictionary, 5, rng)
+        # a game saved before candidates were stored
+        game = {"secret": secret, "guesses": guesses}
+        assert update_candidates(game, dictionary) == expected_count(dictionary, secret, guesses)
+        assert game["candidates"]["n"] == len(guesses)
+
+
+def test_fingerprint_mismatch_rebuilds_against_the_new_list():
+    old = get_dictionary()
+    rng = random.Random(2)
+    words = list(old.words(5))
+    secret, guesses = random_game(old, 5, rng, guesses=2)
+    game = {"secret": secret, "guesses": guesses[:1]}
+    update_candidates(game, old)
+
+    # the list changes mid-game: a third of the words go, the secret stays
+    kept = [w for w in words if w == secret or rng.random() > 0.3]
+    new = Dictionary.from_lists(kept, set(old.valid_words(5)) - set(kept))
+    assert new.fingerprint(5) != old.fingerprint(5)
+
+    game["guesses"] = guesses
+    assert update_candidates(game, new) == expected_count(new, secret, guesses)
+    assert game["candidates"]["fp"] == new.fingerprint(5)
+    assert [new.words(5)[i] for i in candidate_indices(game, new)] == brute_force(new, secret, guesses)
+
+    # the secret leaves the main list: it still counts, the bitset has only main words
+    without = Dictionary.from_lists([w for w in kept if w != secret], set(old.valid_words(5)) - set(kept) | {secret})
+    assert update_candidates(game, without) == expected_count(without, secret, guesses)
+    assert secret not in [without.words(5)[i] for i in candidate_indices(game, without)]
@@ -0,0 +1,38 @@
+"""Difficulty scores recomputed for missing and stale lengths."""
+import logging
+
+import numpy as np
+
+from src.game.compile_dictionary import read_difficulty, write_difficulty
+from src.game.dictionary import Dictionary, get_dictionary
+from src.game.difficulty import update_difficulty
+
+
+def test_missing_then_stale_lengths_are_recomputed(tmp_path):
+    path = tmp_path / "difficulty.npz"
+    dictionary = get_dictionary()
+    lengths = [length for length in range(4, 12) if dictionary.words(length)]
+
+    assert update_difficulty(repeat=2, workers=1, path=path) == lengths
+    assert dictionary.has_difficulty()
+    assert update_difficulty(repeat=2, workers=1, path=path) == []
+
+    # the list of 5-letter words changed since the file was written
+    scores = read_difficulty(path)
+    scores[5] = ("0" * 12, scores[5][1])
+    write_difficulty(scores, path)
+    assert update_difficulty(repeat=2, workers=1, path=path) == [5]
+    assert read_difficulty(path)[5][0] == dictionary.fingerprint(5)
+    for length in lengths:
+        assert len(dictionary.difficulty(length)) == len(dictionary.words(length))
+        assert len(dictionary.difficulty_buckets(length)) == 3
+
+
+def test_stale_scores_are_ignored_with_a_warning(caplog):
+    dictionary = Dictionary.from_lists(["слово", "книга", "пирог"], [])
+    dictionary.set_difficulty({5: ("stale", np.zeros(3, dtype=np.float32))})
+    with caplog.at_level(logging.WARNING):
+        assert dictionary.difficulty(5) is None
+        assert dictionary.random_word(5, "hard") in {"слово", "книга", "пирог"}
+    assert not dictionary.has_difficulty()
+    assert "stale" in caplog.text
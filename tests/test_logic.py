@@ -0,0 +1,71 @@
+"""Batched base-3 feedback against the reference make_feedback, word validation."""
+import random
+
+import numpy as np
+import pytest
+
+from src.game.dictionary import get_dictionary
+from src.game.logic import (encode_word, encode_words, feedback_codes, guess_vs_secrets,
+                            is_game_word, make_feedback, pattern_code, pattern_feedback)
+from src.languages.russian import replace_yo
+
+# repeated letters on either side, ё before normalizing
+TRICKY = [
+    ("ёлка", "елка"), ("ёжик", "жжёт"), ("ааба", "баба"), ("баба", "ааба"),
+    ("колос", "сокол"), ("молоко", "колено"), ("ооооо", "мотор"), ("мотор", "ооооо"),
+    ("шалаш", "ааааа"), ("ааааа", "шалаш"), ("приёмник", "премьера"),
+]
+
+
+def check(pairs):
+    by_length = {}
+    for guess, secret in pairs:
+        guess, secret = replace_yo(guess), replace_yo(secret)
+        by_length.setdefault(len(guess), []).append((guess, secret))
+    for length, group in by_length.items():
+        guesses = encode_words([g for g, _ in group], length)
+        secrets = encode_words([s for _, s in group], length)
+        codes = feedback_codes(guesses, secrets)
+        for (guess, secret), code in zip(group, codes):
+            expected = make_feedback(secret, guess)
+            assert pattern_feedback(code, length) == expected, (guess, secret)
+            assert pattern_code(expected) == code
+
+
+def test_tricky_pairs_match_make_feedback():
+    check(TRICKY)
+
+
+def test_random_pairs_match_make_feedback():
+    rng = random.Random(0)
+    dictionary = get_dictionary()
+    pairs = []
+    for length in range(4, 12):
+        valid, words = dictionary.valid_words(length), dictionary.words(length)
+        pairs += [(rng.choice(valid), rng.choice(words)) for _ in range(500)]
+        # same letters in another order: many yellows and repeats
+        for _ in range(100):
+            secret = rng.choice(words)
+            pairs.append(("".join(rng.sample(secret, length)), secret))
+    check(pairs)
+
+
+def test_one_guess_against_many_secrets():
+    dictionary = get_dictionary()
+    secrets = dictionary.words(5)
+    guess = secrets[len(secrets) // 2]
+    codes = guess_vs_secrets(guess, dictionary.codes(5))
+    assert [pattern_feedback(c, 5) for c in codes] == [make_feedback(s, guess) for s in secrets]
+    assert codes[len(secrets) // 2] == 3 ** 5 - 1
+    assert np.array_equal(encode_word(guess), dictionary.codes(5)[len(secrets) // 2])
+
+
+@pytest.mark.parametrize("word", ["ёлка", "Слово", " дерево ", "координатор"])
+def test_is_game_word_accepts_russian(word):
+    assert is_game_word(word)
+
+
+@pytest.mark.parametrize("word", ["hello", "слоvo", "їжак", "ґанок", "єнот", "сiль", "кот", "ab", "слово1",
+                                  "абвгдежзийкл"])
+def test_is_game_word_rejects_other_letters_and_lengths(word):
+    assert not is_game_word(word)
@@ -0,0 +1,47 @@
+"""Wake-up reminders racing a handler of the same user."""
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.fakes import FakeBot
+from src.commands.notification import send_unfinished_games
+from src.storage import store
+from src.storage.backends import SqliteBackend
+from src.storage.locks import user_lock
+
+
+def test_reminder_flag_survives_a_concurrent_handler(tmp_path):
+    backend = SqliteBackend(tmp_path / "user_activity.db")
+    backend.put_user("7", {
+        "stats": {"games_played": 0, "wins": 0, "losses": 0},
+        "notify_on_wakeup": True,
+        "current_game": {"secret": "слово", "attempts": 1, "guesses": ["запас"]},
+    })
+    store.set_backend(backend)
+    store.load_indexes()
+
+    async def handler():
+        # a guess in flight: holds the user's lock with a copy loaded before the reminder
+        async with user_lock("7"):
+            user = store.load_user("7")
+            await asyncio.sleep(0.05)
+            user["current_game"]["attempts"] += 1
+            store.save_user("7", user)
+
+    async def scenario():
+        bot = FakeBot()
+        running = asyncio.create_task(handler())
+        await asyncio.sleep(0)
+        await send_unfinished_games(SimpleNamespace(bot=bot))
+        await running
+        return bot
+
+    try:
+        bot = asyncio.run(scenario())
+        user = store.load_user("7")
+        assert [chat_id for chat_id, _ in bot.sent] == [7]
+        # neither write is lost
+        assert user["notified"] is True
+        assert user["current_game"]["attempts"] == 2
+    finally:
+        store.set_backend(None)
+        backend.close()
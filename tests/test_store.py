@@ -0,0 +1,82 @@
+"""SQLite reads during a write transaction, write-behind flush failures."""
+import asyncio
+import threading
+
+import pytest
+
+from src.storage import store
+from src.storage.backends import SqliteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    b = SqliteBackend(tmp_path / "user_activity.db")
+    yield b
+    b.close()
+
+
+def test_reads_are_served_while_a_batch_write_is_open(backend):
+    backend.put_user("1", {"v": 1})
+    inside, release = threading.Event(), threading.Event()
+    put_rows = backend._put_rows
+
+    def slow_put_rows(users):
+        put_rows(users)
+        # rows written, transaction still open
+        inside.set()
+        release.wait(5)
+
+    backend._put_rows = slow_put_rows
+    writer = threading.Thread(target=backend.put_users, args=({"1": {"v": 2}, "2": {"v": 2}},))
+    writer.start()
+    assert inside.wait(5)
+
+    # through the read-only connection: not blocked by the writer, sees the last commit
+    result = {}
+    reader = threading.Thread(target=lambda: result.update(user=backend.get_user("1"), new=backend.get_user("2")))
+    reader.start()
+    reader.join(2)
+    finished = not reader.is_alive()
+    release.set()
+    writer.join(5)
+    reader.join(5)
+
+    assert finished, "read waited for the write transaction"
+    assert result == {"user": {"v": 1}, "new": None}
+    assert backend.get_user("1") == {"v": 2}
+
+
+class FailingOnce(SqliteBackend):
+    """put_users fails once; a handler saves a newer record of user 1 meanwhile."""
+
+    failed = False
+
+    def put_users(self, users):
+        if not self.failed:
+            self.failed = True
+            store.save_user("1", {"v": "newer"})
+            raise OSError("disk full")
+        super().put_users(users)
+
+
+def test_failed_flush_requeues_the_batch(tmp_path):
+    backend = FailingOnce(tmp_path / "user_activity.db")
+    store.set_backend(backend)
+    try:
+        store.save_user("1", {"v": "old"})
+        store.save_user("2", {"v": "old"})
+
+        asyncio.run(store.flush_store())
+        # batch back in the buffer, the newer save of user 1 kept
+        assert store.pending_count() == 2
+        assert backend.get_user("2") is None
+        assert store.load_user("1") == {"v": "newer"}
+        assert store.load_user("2") == {"v": "old"}
+
+        asyncio.run(store.flush_store())
+        assert store.pending_count() == 0
+        assert backend.get_user("1") == {"v": "newer"}
+        assert backend.get_user("2") == {"v": "old"}
+    finally:
+        store.set_backend(None)
+        backend.close()